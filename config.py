@@ -1,15 +1,16 @@
 import os
 from pathlib import Path
+import numpy as np
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.absolute()
 
-# Ensure the data directory exists
+# Data directory (created by setup_directories() below)
 DATA_DIR = PROJECT_ROOT / 'data'
-os.makedirs(DATA_DIR, exist_ok=True)
 
 # Database paths
 GESTURES_DB_PATH = str(DATA_DIR / 'gestures.json')
+CAMERA_SETTINGS_PATH = str(DATA_DIR / 'camera_res.json')  # Last negotiated camera resolution
 
 # Camera settings - 16:9 aspect ratio
 CAMERA_RESOLUTIONS = [
@@ -21,7 +22,15 @@ CAMERA_RESOLUTIONS = [
     (854, 480),    # FWVGA
     (640, 360)     # nHD
 ]
+# Largest resolution to capture at: frames are shown at most 800 px wide and
+# inferred at HAND_INFERENCE_WIDTH, so bigger frames only cost decode and copy time
+CAMERA_MAX_RESOLUTION = (854, 480)
 CAMERA_FPS = 30
+CAMERA_FOURCC = 'MJPG'  # Compressed format, needed for 30 FPS at HD and above
+CAMERA_OPEN_RETRY_S = 2.0  # Wait this long after a failed camera open before trying again
+# Most frames per second the video widget renders; bursts above it are coalesced
+# so only the latest frame is drawn
+VIDEO_MAX_FPS = 30
 
 # UI Color Scheme
 UI_COLORS = {
@@ -42,37 +51,139 @@ UI_COLORS = {
     'footer_bg': '#1A252F',
 }
 
+def _hex_to_bgr(hex_color: str) -> tuple:
+    """Convert a '#RRGGBB' string to an OpenCV (B, G, R) tuple."""
+    hex_color = hex_color.lstrip('#')
+    return (int(hex_color[4:6], 16), int(hex_color[2:4], 16), int(hex_color[0:2], 16))
+
+# UI_COLORS parsed once for OpenCV drawing code
+UI_COLORS_BGR = {name: _hex_to_bgr(value) for name, value in UI_COLORS.items()}
+
+# Reference hand poses for the gesture classifier: 21 (x, y, z) landmarks each, in
+# MediaPipe order. Only the shape matters, since HandTracker maps every hand to a
+# canonical position, size and orientation before comparing it with these. The
+# gesture database seeds its default gestures with the same poses.
+_PALM_TEMPLATE = (  # Open hand
+    0.5, 0.5, 0.0,  # Wrist
+    0.6, 0.4, 0.0,   # Thumb CMC
+    0.7, 0.3, 0.0,   # Thumb MCP
+    0.8, 0.3, 0.0,   # Thumb IP
+    0.9, 0.3, 0.0,   # Thumb tip
+    0.5, 0.4, 0.0,   # Index MCP
+    0.5, 0.3, 0.0,   # Index PIP
+    0.5, 0.2, 0.0,   # Index DIP
+    0.5, 0.1, 0.0,   # Index tip
+    0.4, 0.4, 0.0,   # Middle MCP
+    0.4, 0.3, 0.0,   # Middle PIP
+    0.4, 0.2, 0.0,   # Middle DIP
+    0.4, 0.1, 0.0,   # Middle tip
+    0.3, 0.4, 0.0,   # Ring MCP
+    0.3, 0.3, 0.0,   # Ring PIP
+    0.3, 0.2, 0.0,   # Ring DIP
+    0.3, 0.1, 0.0,   # Ring tip
+    0.2, 0.5, 0.0,   # Pinky MCP
+    0.2, 0.4, 0.0,   # Pinky PIP
+    0.2, 0.3, 0.0,   # Pinky DIP
+    0.2, 0.2, 0.0    # Pinky tip
+)
+
+_FIST_TEMPLATE = (  # Closed hand
+    0.5, 0.5, 0.0,   # Wrist
+    0.6, 0.4, 0.0,   # Thumb CMC
+    0.7, 0.3, 0.0,   # Thumb MCP
+    0.8, 0.3, 0.0,   # Thumb IP
+    0.9, 0.3, 0.0,   # Thumb tip
+    0.5, 0.4, 0.0,   # Index MCP
+    0.5, 0.5, 0.0,   # Index PIP (folded)
+    0.5, 0.6, 0.0,   # Index DIP (folded)
+    0.5, 0.7, 0.0,   # Index tip (folded)
+    0.4, 0.4, 0.0,   # Middle MCP
+    0.4, 0.5, 0.0,   # Middle PIP (folded)
+    0.4, 0.6, 0.0,   # Middle DIP (folded)
+    0.4, 0.7, 0.0,   # Middle tip (folded)
+    0.3, 0.4, 0.0,   # Ring MCP
+    0.3, 0.5, 0.0,   # Ring PIP (folded)
+    0.3, 0.6, 0.0,   # Ring DIP (folded)
+    0.3, 0.7, 0.0,   # Ring tip (folded)
+    0.2, 0.5, 0.0,   # Pinky MCP
+    0.2, 0.5, 0.0,   # Pinky PIP (folded)
+    0.2, 0.6, 0.0,   # Pinky DIP (folded)
+    0.2, 0.7, 0.0    # Pinky tip (folded)
+)
+
+_POINT_UP_TEMPLATE = (  # Index finger extended, others folded
+    0.5, 0.5, 0.0,   # Wrist
+    0.6, 0.4, 0.0,   # Thumb CMC
+    0.7, 0.3, 0.0,   # Thumb MCP
+    0.8, 0.3, 0.0,   # Thumb IP
+    0.9, 0.3, 0.0,   # Thumb tip
+    0.5, 0.2, 0.0,   # Index MCP
+    0.5, 0.1, 0.0,   # Index PIP
+    0.5, 0.0, 0.0,   # Index DIP
+    0.5, -0.1, 0.0,  # Index tip
+    0.4, 0.4, 0.0,   # Middle MCP
+    0.4, 0.5, 0.0,   # Middle PIP (folded)
+    0.4, 0.6, 0.0,   # Middle DIP (folded)
+    0.4, 0.7, 0.0,   # Middle tip (folded)
+    0.3, 0.4, 0.0,   # Ring MCP
+    0.3, 0.5, 0.0,   # Ring PIP (folded)
+    0.3, 0.6, 0.0,   # Ring DIP (folded)
+    0.3, 0.7, 0.0,   # Ring tip (folded)
+    0.2, 0.5, 0.0,   # Pinky MCP
+    0.2, 0.5, 0.0,   # Pinky PIP (folded)
+    0.2, 0.6, 0.0,   # Pinky DIP (folded)
+    0.2, 0.7, 0.0    # Pinky tip (folded)
+)
+
 # Gesture type identifiers
 GESTURE_TYPES = {
     'palm': {
         'name': '🖐️ Palm',
         'color': (0, 255, 0),  # Green
-        'min_landmark_dist': 0.1,  # Minimum distance between landmarks to be considered this gesture
-        'max_landmark_dist': 0.5   # Maximum distance between landmarks
+        'template': _PALM_TEMPLATE
     },
     'fist': {
         'name': '✊ Fist',
         'color': (0, 0, 255),  # Red
-        'min_landmark_dist': 0.02,
-        'max_landmark_dist': 0.2
+        'template': _FIST_TEMPLATE
     },
     'point_up': {
         'name': '👆 Point Up',
         'color': (255, 255, 0),  # Yellow
-        'min_landmark_dist': 0.05,
-        'max_landmark_dist': 0.4
+        'template': _POINT_UP_TEMPLATE
     },
     
 }
 
+# Gesture ids and templates as parallel sequences (in GESTURE_IDS order) so the
+# classifier can compare against every template at once
+GESTURE_IDS = list(GESTURE_TYPES)
+GESTURE_TEMPLATES = np.array([g['template'] for g in GESTURE_TYPES.values()], dtype=np.float32).reshape(-1, 21, 3)
+
+# Largest RMS landmark distance from the nearest template, in wrist-to-middle-MCP
+# lengths, for a hand to count as that gesture. The closest two templates (fist and
+# point up) are 1.69 apart in canonical pose, so this is just under half of that
+# and no hand can be within range of two templates
+GESTURE_TEMPLATE_MAX_DIST = 0.8
+
 # Hand tracking settings
 MAX_NUM_HANDS = 2
 HAND_DETECTION_CONFIDENCE = 0.5
 HAND_TRACKING_CONFIDENCE = 0.5
+HAND_INFERENCE_WIDTH = 256  # Wider frames are downscaled to this width before MediaPipe runs on them
+HAND_INFERENCE_STRIDE = 2  # Run MediaPipe on every Nth frame while a hand is tracked (1 = every frame)
+HAND_REUSE_MAX_MOTION = 0.01  # Skipped frames reuse the last result only if the landmarks moved less than this (mean, in frame widths/heights) between the last two inferences
+FRAME_DIFF_SIZE = (64, 48)  # Thumbnail (width, height) compared to detect a static scene
+FRAME_DIFF_PIXEL_THRESHOLD = 16  # Gray-level change for a thumbnail pixel to count as changed
+FRAME_DIFF_MIN_PIXELS = 2  # Changed thumbnail pixels needed to rerun inference (a finger is ~6)
 
 # Text-to-speech settings
-TTS_LANGUAGE = 'en'
+TTS_LANGUAGE = 'en'  # Used by gTTS; the offline engine speaks with the system voice
 TTS_SLOW = False
+# 'gtts' (Google, needs network; phrases are cached on disk) or 'pyttsx3' (offline,
+# opt-in). pyttsx3 is driven from the speech worker thread, which eSpeak handles
+# but the SAPI5 and NSSpeechSynthesizer drivers may hang on
+TTS_BACKEND = 'gtts'
 
 # Gesture recognition settings
 GESTURE_RECOGNITION_THRESHOLD = 0.7
@@ -82,9 +193,15 @@ MIN_TRACKING_CONFIDENCE = 0.5
 # Debug settings
 DEBUG = True
 
+_directories_ready = False
+
 def setup_directories():
-    """Ensure all required directories exist."""
+    """Ensure all required directories exist (only touches the disk once)."""
+    global _directories_ready
+    if _directories_ready:
+        return
     os.makedirs(DATA_DIR, exist_ok=True)
+    _directories_ready = True
 
 # Run setup on import
 setup_directories()
@@ -1,26 +0,0 @@
-# Application settings and constants
-
-# Camera settings
-CAMERA_WIDTH = 640
-CAMERA_HEIGHT = 480
-
-# MediaPipe settings
-HAND_DETECTION_CONFIDENCE = 0.7
-HAND_TRACKING_CONFIDENCE = 0.5
-MAX_NUM_HANDS = 1
-
-# Gesture recognition
-GESTURE_MATCH_THRESHOLD = 0.5  # Threshold for gesture matching
-
-# File paths
-GESTURES_DB_PATH = "data/gestures.json"
-ASSETS_DIR = "assets"
-ICONS_DIR = "assets/icons"
-
-# UI settings
-WINDOW_TITLE = "Sign-to-Speech Translator"
-WINDOW_SIZE = "1200x800"
-
-# Text-to-speech settings
-TTS_LANGUAGE = 'en'
-TTS_SLOW = False
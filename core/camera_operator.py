@@ -1,24 +1,92 @@
 import cv2
+import json
+import numpy as np
 import threading
 import time
-from queue import Queue
 import config  # Import the config module directly
 import logging
 
+try:
+    # Optional: libjpeg-turbo bindings for decoding raw MJPG frames
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:
+    TurboJPEG = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CameraOperator:
-    def __init__(self):
+    def __init__(self, raw_jpeg: bool = False, on_demand: bool = False):
+        """
+        Initialize the camera operator.
+        
+        Args:
+            raw_jpeg: If True, ask the backend not to decode MJPG frames and
+                      decode them here instead, with libjpeg-turbo when
+                      PyTurboJPEG is installed
+            on_demand: If True, the capture thread sleeps until get_frame() asks
+                       for a frame and then grabs exactly one, instead of
+                       grabbing continuously at the camera frame rate
+        """
         self.cap = None
-        self.frame_queue = Queue(maxsize=1)  # Store only the latest frame
+        self.raw_jpeg = raw_jpeg
+        self.on_demand = on_demand
+        self._jpeg = None
+        
+        # Single slot holding only the latest frame, guarded by a lock
+        self._frame_lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._frame_lock)
+        self._latest_frame = None
+        self._latest_timestamp = None  # time.monotonic() when the frame was grabbed
+        
+        # Preallocated frame buffers, reused instead of allocating per frame
+        self._buffers = None
+        self._buf_idx = 0
+        
         self.running = False
         self.thread = None
         self.camera_initialized = threading.Event()
         
-        # Initialize camera in the main thread
-        self._init_camera()
+        # Set when a consumer wants a new frame decoded; the capture thread
+        # keeps grabbing in the meantime but only retrieves (decodes) on demand
+        self._retrieve_now = threading.Event()
+        self._retrieve_now.set()
+        
+        # The device is opened lazily on first use, see _ensure_open(); the flag
+        # is only set once an open succeeded. After a failed open the next try
+        # waits until _open_retry_at (time.monotonic()), so callers polling
+        # get_frame() don't reopen a missing camera on every call
+        self._open_lock = threading.Lock()
+        self._open_attempted = False
+        self._open_retry_at = 0.0
+    
+    def _ensure_open(self) -> bool:
+        """Open the camera the first time it's needed, or again after a failed open or release()."""
+        if not self._open_attempted and time.monotonic() >= self._open_retry_at:
+            with self._open_lock:
+                if not self._open_attempted and time.monotonic() >= self._open_retry_at:
+                    self._open_attempted = self._init_camera()
+                    if not self._open_attempted:
+                        self._open_retry_at = time.monotonic() + config.CAMERA_OPEN_RETRY_S
+        return self.running
+    
+    def _load_cached_resolution(self):
+        """Return the last resolution that worked for this camera, if any."""
+        try:
+            with open(config.CAMERA_SETTINGS_PATH, 'r') as f:
+                width, height = json.load(f)['resolution']
+            return int(width), int(height)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _save_cached_resolution(self, width: int, height: int) -> None:
+        """Remember a resolution that worked so the next start can skip probing."""
+        try:
+            with open(config.CAMERA_SETTINGS_PATH, 'w') as f:
+                json.dump({'resolution': [width, height]}, f)
+        except OSError as e:
+            logger.warning(f"Could not save camera settings: {e}")
     
     def _init_camera(self) -> bool:
         """Initialize the camera with the specified settings."""
@@ -34,26 +102,48 @@ class CameraOperator:
                 logger.error("Could not open camera. Please check if it's connected and not in use by another application.")
                 return False
             
-            # Try each resolution in order until we find one that works
+            # Keep the driver-side buffer to a single frame so we always see the live image
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            buffer_honoured = int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)) == 1
+            if not buffer_honoured:
+                logger.warning("Camera backend ignored CAP_PROP_BUFFERSIZE=1, flushing stale frames at startup")
+            
+            # Request MJPG before the resolution; raw YUY2 can't reach 30 FPS at HD and above.
+            # This must happen before setting width/height on many backends.
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config.CAMERA_FOURCC))
+            if self.raw_jpeg:
+                # Skip OpenCV's JPEG->BGR decode, _decode_jpeg() handles the compressed buffer
+                self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+                self._jpeg = self._create_jpeg_decoder()
+            
+            # Use the resolution that worked last time if the camera still accepts it
+            # and it's within the capture limit
             success = False
-            for width, height in config.CAMERA_RESOLUTIONS:
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            max_width, max_height = config.CAMERA_MAX_RESOLUTION
+            cached = self._load_cached_resolution()
+            if cached is not None and cached[0] <= max_width and cached[1] <= max_height:
+                success = self._set_resolution(*cached) == cached
                 
-                # Get the actual resolution that was set
-                actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                
-                # If we got the resolution we asked for, use it
-                if actual_width == width and actual_height == height:
-                    logger.info(f"Successfully set camera resolution to: {actual_width}x{actual_height}")
-                    success = True
-                    break
-            
             if not success:
+                # Ask for an oversized frame, the driver clamps it to the sensor maximum,
+                # then go straight to the largest configured resolution that fits both
+                # the sensor and the capture limit
+                native_width, native_height = self._set_resolution(100000, 100000)
+                max_width, max_height = min(max_width, native_width), min(max_height, native_height)
+                for width, height in config.CAMERA_RESOLUTIONS:
+                    if width > max_width or height > max_height:
+                        continue
+                    if self._set_resolution(width, height) == (width, height):
+                        success = True
+                        self._save_cached_resolution(width, height)
+                        break
+                        
+            actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if success:
+                logger.info(f"Successfully set camera resolution to: {actual_width}x{actual_height}")
+            else:
                 # If no resolution worked, use whatever the camera defaulted to
-                actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                 logger.warning(f"Could not set requested resolution. Using default: {actual_width}x{actual_height}")
             
             # Set FPS if supported
@@ -61,89 +151,227 @@ class CameraOperator:
             actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
             logger.info(f"Camera FPS set to: {actual_fps}")
             
+            # Drain whatever frames the driver queued up while we were configuring it
+            if not buffer_honoured:
+                for _ in range(4):
+                    self.cap.grab()
+            
             # Store the actual resolution for later use
             self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             
+            # Double buffer: one frame published to the consumer, one being written.
+            # Raw JPEG buffers vary in size so they're left to OpenCV to allocate.
+            # Plain host memory on purpose: MediaPipe's Python API takes CPU numpy
+            # input, so there is no device upload for page-locked memory to speed up.
+            if not self.raw_jpeg:
+                self._buffers = [np.empty((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+                                 for _ in range(2)]
+                self._buf_idx = 0
+            
             # Start the frame grabbing thread
             self.running = True
             self.thread = threading.Thread(target=self._update_frame, daemon=True)
             self.thread.start()
             
             # Wait for the first frame to be captured
-            start_time = time.time()
-            while not self.camera_initialized.is_set() and (time.time() - start_time) < 5:
-                time.sleep(0.1)
-                
-            if not self.camera_initialized.is_set():
+            if not self.camera_initialized.wait(timeout=5.0):
                 logger.error("Timed out waiting for camera to initialize")
+                # Stop the capture thread so a later open starts from scratch
+                self.running = False
+                self.cap.release()
                 return False
                 
             return True
             
         except Exception as e:
-            logger.error(f"Error initializing camera: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            if hasattr(self, 'cap'):
+            logger.exception(f"Error initializing camera: {e}")
+            if self.cap is not None:
                 self.cap.release()
             return False
     
+    def _create_jpeg_decoder(self):
+        """Create a libjpeg-turbo decoder, or return None to fall back to OpenCV."""
+        if TurboJPEG is None:
+            logger.info("PyTurboJPEG not installed, decoding MJPG frames with OpenCV")
+            return None
+        try:
+            return TurboJPEG()
+        except (OSError, RuntimeError) as e:
+            # The Python package is there but the native library couldn't be loaded
+            logger.warning(f"Could not load libjpeg-turbo, decoding MJPG frames with OpenCV: {e}")
+            return None
+    
+    def _decode_jpeg(self, buffer):
+        """Decode a raw MJPG buffer to a BGR image."""
+        if self._jpeg is not None:
+            return self._jpeg.decode(buffer, pixel_format=TJPF_BGR)
+        return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    
+    def _set_resolution(self, width: int, height: int):
+        """Request a capture resolution and return the one the driver actually set."""
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    
+    def _make_retrieve(self):
+        """
+        Build the retrieve step for the negotiated capture settings.
+        
+        The returned function decodes into the current write buffer, or lets
+        OpenCV allocate when there are no preallocated buffers (raw JPEG mode).
+        """
+        cap_retrieve = self.cap.retrieve
+        buffers = self._buffers
+        if buffers is None:
+            return cap_retrieve
+        
+        def retrieve():
+            return cap_retrieve(buffers[self._buf_idx])
+        return retrieve
+    
     def _update_frame(self):
-        """Continuously grab frames from the camera."""
+        """
+        Continuously grab frames from the camera.
+        
+        Runs in a thread rather than a separate process: grab(), retrieve() and
+        the JPEG decoders release the GIL, so the only Python work per frame is
+        the slot handoff and it doesn't compete with inference on the UI thread.
+        """
         consecutive_errors = 0
         max_errors = 5
+        update_errors = 0  # Exceptions in a row, only every 30th is logged
+        
+        # Bind the per-frame calls once; this thread only ever serves one capture
+        grab = self.cap.grab
+        retrieve = self._make_retrieve()
+        retrieve_requested = self._retrieve_now.is_set
+        wait_for_request = self._retrieve_now.wait
+        monotonic = time.monotonic
+        on_demand = self.on_demand
         
         while self.running:
             try:
-                ret, frame = self.cap.read()
+                # In on-demand mode, idle until a consumer asks for a frame
+                # (with a timeout so release() can still stop the thread)
+                if on_demand and not wait_for_request(timeout=0.1):
+                    continue
+                    
+                # grab() advances the stream without decoding the frame
+                ret = grab()
+                grab_time = monotonic()
+                frame = None
+                if ret and retrieve_requested():
+                    ret, frame = retrieve()
+                    
                 if not ret:
                     consecutive_errors += 1
-                    logger.warning(f"Failed to grab frame (attempt {consecutive_errors}/{max_errors})")
+                    logger.warning("Failed to grab frame (attempt %d/%d)", consecutive_errors, max_errors)
                     
                     if consecutive_errors >= max_errors:
                         logger.error("Max consecutive errors reached. Attempting to reinitialize camera...")
-                        if not self._init_camera():
-                            logger.error("Failed to reinitialize camera")
-                            break
-                        consecutive_errors = 0
-                        continue
+                        with self._open_lock:
+                            self.cap.release()
+                            self.camera_initialized.clear()
+                            if not self.running:
+                                # release() was called meanwhile
+                                return
+                            if not self._init_camera():
+                                logger.error("Failed to reinitialize camera")
+                                # Stop instead of spinning on a released capture; the
+                                # next get_frame() tries to open the camera again
+                                self.running = False
+                                self._open_attempted = False
+                                self._open_retry_at = time.monotonic() + config.CAMERA_OPEN_RETRY_S
+                        # On success _init_camera started a fresh thread for the new capture
+                        return
                     
                     time.sleep(0.1)
                     continue
                 
-                # Reset error counter on successful frame capture
+                # Reset error counters on successful frame capture
                 consecutive_errors = 0
+                update_errors = 0
                 
-                # Mirror the frame
-                frame = cv2.flip(frame, 1)
+                # Nobody is waiting for a new frame, skip the decode
+                if frame is None:
+                    continue
+                self._retrieve_now.clear()
                 
-                # Replace the frame in the queue (discard old frames)
-                while not self.frame_queue.empty():
-                    try:
-                        self.frame_queue.get_nowait()
-                    except:
-                        break
-                        
-                self.frame_queue.put(frame)
+                if self.raw_jpeg:
+                    frame = self._decode_jpeg(frame)
+                    if frame is None:
+                        logger.warning("Failed to decode MJPG frame")
+                        continue
+                
+                # Replace the frame in the slot (discard the old one)
+                with self._frame_ready:
+                    self._latest_frame = frame
+                    self._latest_timestamp = grab_time
+                    self._frame_ready.notify()
+                
+                # Write the next frame into the other buffer
+                self._buf_idx ^= 1
                 
                 # Signal that we've successfully captured at least one frame
                 if not self.camera_initialized.is_set():
                     self.camera_initialized.set()
                 
             except Exception as e:
-                logger.error(f"Error in frame update: {e}")
+                # Rate-limit so a failing camera can't flood the log at frame rate
+                update_errors += 1
+                if update_errors == 1 or update_errors % 30 == 0:
+                    logger.error("Error in frame update (%d in a row): %s", update_errors, e)
                 time.sleep(0.1)
     
     def get_frame(self):
-        """Get the latest frame from the camera."""
+        """
+        Get the latest frame from the camera.
+        
+        The returned array is a mirrored view of one of the camera's reusable
+        buffers and is only valid until the next call to get_frame(); copy it
+        (np.ascontiguousarray / frame.copy()) to keep it or draw on it.
+        """
+        return self.get_timestamped_frame()[1]
+    
+    def get_timestamped_frame(self, max_age: float = None):
+        """
+        Get the latest frame together with the time it was grabbed.
+        
+        Args:
+            max_age: If given, frames grabbed more than this many seconds ago
+                     are dropped instead of returned
+            
+        Returns:
+            Tuple of (time.monotonic() timestamp, frame), or (None, None) if
+            no fresh frame is available
+        """
+        if not self._ensure_open():
+            return None, None
+            
         try:
-            if not self.frame_queue.empty():
-                return self.frame_queue.get()
-            return None
+            with self._frame_lock:
+                if self.on_demand and self._latest_frame is None:
+                    # Wake the capture thread and wait briefly for the frame it grabs
+                    self._retrieve_now.set()
+                    self._frame_ready.wait(timeout=0.1)
+                frame, self._latest_frame = self._latest_frame, None
+                timestamp = self._latest_timestamp
+            # In continuous mode, ask the capture thread to decode the next frame now.
+            # On demand, the next call asks when it finds the slot empty, so it gets
+            # a frame grabbed then rather than one prefetched after this call.
+            if not self.on_demand:
+                self._retrieve_now.set()
+            
+            if frame is None:
+                return None, None
+            if max_age is not None and time.monotonic() - timestamp > max_age:
+                return None, None
+            # Mirror with a negative-stride view instead of copying the frame
+            return timestamp, frame[:, ::-1]
         except Exception as e:
             logger.error(f"Error getting frame: {e}")
-            return None
+            return None, None
     
     def release(self):
         """Release the camera resources."""
@@ -152,18 +380,22 @@ class CameraOperator:
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=2.0)
         
-        if hasattr(self, 'cap') and self.cap is not None:
+        if self.cap is not None:
             try:
-                if self.cap.isOpened():
-                    self.cap.release()
-            except:
-                pass
+                self.cap.release()
+            except cv2.error as e:
+                logger.warning(f"Error releasing camera: {e}")
             self.cap = None
             
         self.camera_initialized.clear()
+        # Let the next get_frame() open the camera again, without waiting out a
+        # retry delay from an earlier failure
+        self._open_attempted = False
+        self._open_retry_at = 0.0
     
     def is_opened(self):
         """Check if the camera is open and available."""
+        self._ensure_open()
         return self.cap is not None and self.cap.isOpened() and self.camera_initialized.is_set()
     
     def __del__(self):
@@ -1,11 +1,131 @@
+import atexit
+import functools
 import json
+import logging
+import math
+import mmap
 import os
+import shutil
+import threading
 import time
-from typing import Dict, Any, Optional
+import weakref
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional
 from pathlib import Path
 import numpy as np
+import config
+
+try:
+    # Optional: much faster JSON encoding/decoding, with native ndarray support
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(obj):
+    """Let the stdlib encoder write numpy arrays and scalars."""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize the database to indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, default=_json_default).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Any:
+    """Parse the database from JSON bytes."""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Version 3 keeps landmarks in a binary .npy sidecar next to the JSON index, named
+# after a generation id the index records, so the two can't get out of step.
+# Version 2 (one fixed sidecar name) and version 1 (landmarks inline as JSON
+# floats) files are migrated on load.
+DB_VERSION = 3
+
+# Below this size a plain read is cheaper than setting up a memory map
+_MMAP_MIN_SIZE = 64 * 1024
+
+# Databases that may still have a debounced save pending, flushed at exit. Held
+# weakly so registering for the exit flush doesn't keep a database alive
+_open_databases = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_databases() -> None:
+    """Write the pending changes of every database still around at exit."""
+    for db in list(_open_databases):
+        db.flush()
+
+
+# Default gestures used to initialize the database, with the classifier's template
+# poses as landmarks. Read-only; _get_default_gestures hands out mutable copies
+_DEFAULT_GESTURES = MappingProxyType({
+    "fist_default": MappingProxyType({
+        "name": "✊ Fist",
+        "landmarks": config.GESTURE_TYPES['fist']['template'],
+        "message": "I NEED HELP",
+        "created_at": 0,  # Use 0 as the timestamp for all default gestures
+        "is_default": True
+    }),
+    "point_up_default": MappingProxyType({
+        "name": "👆 Point Up",
+        "landmarks": config.GESTURE_TYPES['point_up']['template'],
+        "message": "I HAVE A DOUBT",
+        "created_at": 0,
+        "is_default": True
+    }),
+    "palm_default": MappingProxyType({
+        "name": "🖐️ Palm",
+        "landmarks": config.GESTURE_TYPES['palm']['template'],
+        "message": "WAIT A MINUTE",
+        "created_at": 0,
+        "is_default": True
+    }),
+})
+
 
 class GestureDatabase:
+    # MediaPipe hand layout: 21 (x, y, z) points, stored flat as 63 values
+    _SHAPE = (21, 3)
+    _N_VALUES = 63
+    # Index of the middle finger MCP, whose distance from the wrist sets the scale
+    _MIDDLE_MCP = 9
+    # Hands smaller than this (a degenerate detection) are left unscaled
+    _INV_SCALE_EPS = 1e-8
+    
+    # Per-landmark weights for the match score: fingertips (4, 8, 12, 16, 20)
+    # jitter the most between frames so they count half, normalized to sum to 1
+    _LANDMARK_WEIGHTS = np.ones(_SHAPE[0], dtype=np.float32)
+    _LANDMARK_WEIGHTS[[4, 8, 12, 16, 20]] = 0.5
+    _LANDMARK_WEIGHTS /= _LANDMARK_WEIGHTS.sum()
+    # The same weights per flat coordinate, for scoring the (N, 63) index with one matrix product
+    _COORD_WEIGHTS = np.repeat(_LANDMARK_WEIGHTS, _SHAPE[1])
+    
+    # A repeat of a recently matched gesture scoring at least this well is accepted
+    # without comparing against the rest of the index
+    _EARLY_EXIT_SCORE = 0.95
+    # Recent matches tried that way: one per hand, so two tracked hands matched one
+    # after the other each find their own gesture instead of evicting the other's
+    _RECENT_MATCHES = 2
+    
+    # Normalized landmarks are quantized to 1/64 for the match cache key, so
+    # frames that barely differ share one cached result
+    _FINGERPRINT_SCALE = 64.0
+    
+    # Seconds to wait after the last add/delete before writing the file, so a
+    # burst of edits is saved once
+    _SAVE_DELAY = 0.5
+    
     def __init__(self, db_path: str = None):
         """Initialize the gesture database.
         
@@ -24,222 +144,100 @@ class GestureDatabase:
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             
         self.gestures: Dict[str, Dict[str, Any]] = {}
-        self._ensure_db_exists()
-        self.load_gestures()
-        print(f"Using gesture database at: {self.db_path}")  # Debug output
-    
-    def _get_default_gestures(self) -> Dict[str, Dict[str, Any]]:
-        """Return default gestures with proper landmarks to initialize the database."""
-        # Palm gesture landmarks (open hand)
-        palm_landmarks = [
-            0.5, 0.5, 0.0,  # Wrist
-            0.6, 0.4, 0.0,   # Thumb CMC
-            0.7, 0.3, 0.0,   # Thumb MCP
-            0.8, 0.3, 0.0,   # Thumb IP
-            0.9, 0.3, 0.0,   # Thumb tip
-            0.5, 0.4, 0.0,   # Index MCP
-            0.5, 0.3, 0.0,   # Index PIP
-            0.5, 0.2, 0.0,   # Index DIP
-            0.5, 0.1, 0.0,   # Index tip
-            0.4, 0.4, 0.0,   # Middle MCP
-            0.4, 0.3, 0.0,   # Middle PIP
-            0.4, 0.2, 0.0,   # Middle DIP
-            0.4, 0.1, 0.0,   # Middle tip
-            0.3, 0.4, 0.0,   # Ring MCP
-            0.3, 0.3, 0.0,   # Ring PIP
-            0.3, 0.2, 0.0,   # Ring DIP
-            0.3, 0.1, 0.0,   # Ring tip
-            0.2, 0.5, 0.0,   # Pinky MCP
-            0.2, 0.4, 0.0,   # Pinky PIP
-            0.2, 0.3, 0.0,   # Pinky DIP
-            0.2, 0.2, 0.0    # Pinky tip
-        ]
         
-        # Fist gesture landmarks (closed hand)
-        fist_landmarks = [
-            0.5, 0.5, 0.0,   # Wrist
-            0.6, 0.4, 0.0,   # Thumb CMC
-            0.7, 0.3, 0.0,   # Thumb MCP
-            0.8, 0.3, 0.0,   # Thumb IP
-            0.9, 0.3, 0.0,   # Thumb tip
-            0.5, 0.4, 0.0,   # Index MCP
-            0.5, 0.5, 0.0,   # Index PIP (folded)
-            0.5, 0.6, 0.0,   # Index DIP (folded)
-            0.5, 0.7, 0.0,   # Index tip (folded)
-            0.4, 0.4, 0.0,   # Middle MCP
-            0.4, 0.5, 0.0,   # Middle PIP (folded)
-            0.4, 0.6, 0.0,   # Middle DIP (folded)
-            0.4, 0.7, 0.0,   # Middle tip (folded)
-            0.3, 0.4, 0.0,   # Ring MCP
-            0.3, 0.5, 0.0,   # Ring PIP (folded)
-            0.3, 0.6, 0.0,   # Ring DIP (folded)
-            0.3, 0.7, 0.0,   # Ring tip (folded)
-            0.2, 0.5, 0.0,   # Pinky MCP
-            0.2, 0.5, 0.0,   # Pinky PIP (folded)
-            0.2, 0.6, 0.0,   # Pinky DIP (folded)
-            0.2, 0.7, 0.0    # Pinky tip (folded)
-        ]
+        # Guards the gestures dict, the index arrays below and the match scratch
+        # state, which the matcher and the editing methods share across threads
+        self._index_lock = threading.Lock()
         
-        # Point up gesture landmarks (index finger extended, others folded)
-        point_up_landmarks = [
-            0.5, 0.5, 0.0,   # Wrist
-            0.6, 0.4, 0.0,   # Thumb CMC
-            0.7, 0.3, 0.0,   # Thumb MCP
-            0.8, 0.3, 0.0,   # Thumb IP
-            0.9, 0.3, 0.0,   # Thumb tip
-            0.5, 0.2, 0.0,   # Index MCP
-            0.5, 0.1, 0.0,   # Index PIP
-            0.5, 0.0, 0.0,   # Index DIP
-            0.5, -0.1, 0.0,  # Index tip
-            0.4, 0.4, 0.0,   # Middle MCP
-            0.4, 0.5, 0.0,   # Middle PIP (folded)
-            0.4, 0.6, 0.0,   # Middle DIP (folded)
-            0.4, 0.7, 0.0,   # Middle tip (folded)
-            0.3, 0.4, 0.0,   # Ring MCP
-            0.3, 0.5, 0.0,   # Ring PIP (folded)
-            0.3, 0.6, 0.0,   # Ring DIP (folded)
-            0.3, 0.7, 0.0,   # Ring tip (folded)
-            0.2, 0.5, 0.0,   # Pinky MCP
-            0.2, 0.5, 0.0,   # Pinky PIP (folded)
-            0.2, 0.6, 0.0,   # Pinky DIP (folded)
-            0.2, 0.7, 0.0    # Pinky tip (folded)
-        ]
+        # Normalized landmarks of every stored gesture, (N, 21, 3) with one entry
+        # per id in _gesture_ids, so matching is a single vectorised comparison
+        self._gesture_ids: List[str] = []
+        self._norm_matrix: np.ndarray = np.empty((0, *self._SHAPE), dtype=np.float32)
+        self._norm_scratch = np.empty(self._SHAPE, dtype=np.float32)
+        # int16 copy of the quantized query, the bytes of which form the match cache key
+        self._fingerprint_buf = np.empty(self._SHAPE, dtype=np.int16)
+        # Index rows of the latest successful matches, most recent first, tried
+        # before a full scan on the next frames
+        self._recent_matches: List[int] = []
+        # Recent results keyed by quantized landmarks; cleared whenever the index changes
+        self._match_cached = functools.lru_cache(maxsize=64)(self._match_fingerprint)
         
-        # Middle finger gesture (middle finger extended, others folded)
-        middle_finger_landmarks = [
-            0.5, 0.5, 0.0,   # Wrist
-            0.6, 0.4, 0.0,   # Thumb CMC
-            0.7, 0.3, 0.0,   # Thumb MCP
-            0.8, 0.3, 0.0,   # Thumb IP
-            0.9, 0.3, 0.0,   # Thumb tip
-            0.5, 0.4, 0.0,   # Index MCP
-            0.5, 0.5, 0.0,   # Index PIP (folded)
-            0.5, 0.6, 0.0,   # Index DIP (folded)
-            0.5, 0.7, 0.0,   # Index tip (folded)
-            0.4, 0.2, 0.0,   # Middle MCP
-            0.4, 0.1, 0.0,   # Middle PIP
-            0.4, 0.0, 0.0,   # Middle DIP
-            0.4, -0.1, 0.0,  # Middle tip
-            0.3, 0.4, 0.0,   # Ring MCP
-            0.3, 0.5, 0.0,   # Ring PIP (folded)
-            0.3, 0.6, 0.0,   # Ring DIP (folded)
-            0.3, 0.7, 0.0,   # Ring tip (folded)
-            0.2, 0.5, 0.0,   # Pinky MCP
-            0.2, 0.5, 0.0,   # Pinky PIP (folded)
-            0.2, 0.6, 0.0,   # Pinky DIP (folded)
-            0.2, 0.7, 0.0    # Pinky tip (folded)
-        ]
-        
-        # Thumbs up gesture (thumb up, others folded)
-        thumbs_up_landmarks = [
-            0.5, 0.5, 0.0,   # Wrist
-            0.6, 0.4, 0.0,   # Thumb CMC
-            0.7, 0.3, 0.0,   # Thumb MCP
-            0.8, 0.2, 0.0,   # Thumb IP
-            0.9, 0.1, 0.0,   # Thumb tip
-            0.5, 0.4, 0.0,   # Index MCP
-            0.5, 0.5, 0.0,   # Index PIP (folded)
-            0.5, 0.6, 0.0,   # Index DIP (folded)
-            0.5, 0.7, 0.0,   # Index tip (folded)
-            0.4, 0.4, 0.0,   # Middle MCP
-            0.4, 0.5, 0.0,   # Middle PIP (folded)
-            0.4, 0.6, 0.0,   # Middle DIP (folded)
-            0.4, 0.7, 0.0,   # Middle tip (folded)
-            0.3, 0.4, 0.0,   # Ring MCP
-            0.3, 0.5, 0.0,   # Ring PIP (folded)
-            0.3, 0.6, 0.0,   # Ring DIP (folded)
-            0.3, 0.7, 0.0,   # Ring tip (folded)
-            0.2, 0.5, 0.0,   # Pinky MCP
-            0.2, 0.5, 0.0,   # Pinky PIP (folded)
-            0.2, 0.6, 0.0,   # Pinky DIP (folded)
-            0.2, 0.7, 0.0    # Pinky tip (folded)
-        ]
-        
-        # Use fixed timestamps for default gestures
-        timestamp = 0  # Use 0 as the timestamp for all default gestures
+        # Debounced saves: edits restart the timer and flush() writes on its thread.
+        # _save_lock only guards the timer and the pending snapshot, so an edit never
+        # waits for the disk; _write_lock keeps two writes from overlapping.
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_pending = False
+        # Copy of the gestures taken by the edit that queued the pending save, and
+        # the number of that edit and of the last one written, so an older snapshot
+        # never overwrites a newer one that got to the disk first
+        self._save_snapshot: Dict[str, Dict[str, Any]] = {}
+        self._save_seq = 0
+        self._saved_seq = 0
+        _open_databases.add(self)
         
+        # Read the file once; it's only written back when it needed fixing
+        self.gestures, dirty = self._ensure_db_exists()
+        if dirty and not self._save_gestures({"version": DB_VERSION, "gestures": self.gestures}):
+            logger.error("Failed to save gestures to database")
+        self._rebuild_index()
+        logger.debug("Using gesture database at: %s", self.db_path)
+    
+    def _get_default_gestures(self) -> Dict[str, Dict[str, Any]]:
+        """Return default gestures with proper landmarks to initialize the database."""
+        # Fresh dicts and landmark arrays, since callers store and mutate the result
         return {
-            "fist_default": {
-                "name": "✊ Fist",
-                "landmarks": fist_landmarks,
-                "message": "I NEED HELP",
-                "created_at": timestamp,
-                "is_default": True
-            },
-            "point_up_default": {
-                "name": "👆 Point Up",
-                "landmarks": point_up_landmarks,
-                "message": "I HAVE A DOUBT",
-                "created_at": timestamp,
-                "is_default": True
-            },
-            "palm_default": {
-                "name": "🖐️ Palm",
-                "landmarks": palm_landmarks,
-                "message": "WAIT A MINUTE",
-                "created_at": timestamp,
-                "is_default": True
-            },
-            
+            gesture_id: {**gesture, "landmarks": np.array(gesture["landmarks"], dtype=np.float32)}
+            for gesture_id, gesture in _DEFAULT_GESTURES.items()
         }
 
     def _ensure_db_exists(self):
-        """Ensure the database file exists with default gestures if empty or corrupted."""
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        """
+        Load the database, falling back to default gestures if it's missing or corrupted.
         
-        # Default gestures to use if database is empty or corrupted
+        Returns:
+            Tuple of (gestures dict, dirty) where dirty means the file on disk
+            doesn't match the returned gestures and has to be rewritten
+        """
+        # Default gestures to use if database is missing, empty or corrupted
         default_gestures = self._get_default_gestures()
         
-        # If file doesn't exist, create it with default gestures
-        if not os.path.exists(self.db_path):
-            print("Creating new gesture database with default gestures")
-            self.gestures = default_gestures
-            self._save_gestures({
-                "version": 1,
-                "gestures": self.gestures
-            })
-            return
-            
         # Try to load existing database
         try:
-            with open(self.db_path, 'r') as f:
-                data = json.load(f)
-                
-            # Handle different database formats
-            if isinstance(data, dict):
-                if 'gestures' in data and isinstance(data['gestures'], dict):
-                    # New format with version and gestures
-                    self.gestures = data['gestures']
-                else:
-                    # Old format where the entire file is the gestures dict
-                    self.gestures = data
-            else:
-                raise ValueError("Invalid database format")
+            try:
+                gestures, version, lost = self._read_db_file()
+            except FileNotFoundError:
+                # If file doesn't exist, create it with default gestures
+                logger.info("Creating new gesture database with default gestures")
+                return default_gestures, True
+            if lost:
+                # Those gestures are dropped below; keep the old file rather than
+                # overwriting it without them
+                self._backup_db_file()
                 
             # Remove any gestures with empty or invalid landmarks
             valid_gestures = {}
             has_invalid = False
-            for gesture_id, gesture in self.gestures.items():
+            for gesture_id, gesture in gestures.items():
                 # Skip default gestures to avoid duplicates
                 if gesture.get('is_default'):
                     continue
                     
                 # Ensure each gesture has all required fields
                 if not all(key in gesture for key in ['name', 'landmarks', 'message', 'created_at']):
-                    print(f"Warning: Gesture {gesture_id} is missing required fields, skipping")
+                    logger.warning("Gesture %s is missing required fields, skipping", gesture_id)
                     has_invalid = True
                     continue
                     
-                if not isinstance(gesture['landmarks'], list) or len(gesture['landmarks']) == 0:
-                    print(f"Warning: Gesture {gesture_id} has invalid landmarks, skipping")
+                if not isinstance(gesture['landmarks'], np.ndarray) or gesture['landmarks'].size == 0:
+                    logger.warning("Gesture %s has invalid landmarks, skipping", gesture_id)
                     has_invalid = True
                     continue
                     
                 valid_gestures[gesture_id] = gesture
             
             # Add back default gestures if they're missing
-            default_gesture_names = {g['name'].lower() for g in default_gestures.values()}
             existing_gesture_names = {g['name'].lower() for g in valid_gestures.values()}
             
             # Only add default gestures if they're not already present (by name)
@@ -247,318 +245,483 @@ class GestureDatabase:
                 if default_gesture['name'].lower() not in existing_gesture_names:
                     valid_gestures[default_id] = default_gesture
             
-            # If we found any invalid gestures, update the database
-            if has_invalid or len(valid_gestures) != len(self.gestures):
-                print("Updating gesture database with valid gestures...")
-                self.gestures = valid_gestures
-                if not self._save_gestures({
-                    "version": 1,
-                    "gestures": self.gestures
-                }):
-                    print("Error: Failed to save gestures to database")
-            else:
-                self.gestures = valid_gestures
+            # Only rewrite the file if something was dropped, added back or needs migrating
+            dirty = has_invalid or version < DB_VERSION or valid_gestures.keys() != gestures.keys()
+            if dirty:
+                logger.info("Updating gesture database with valid gestures...")
+            return valid_gestures, dirty
                 
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Error loading gestures from {self.db_path}: {e}")
-            print("Initializing with default gestures")
-            self.gestures = default_gestures
-            self._save_gestures({"version": 1, "gestures": self.gestures})
-            
         except (json.JSONDecodeError, ValueError, KeyError) as e:
-            print(f"Error loading gesture database: {e}. Resetting to defaults.")
-            self.gestures = default_gestures
-            self._save_gestures({
-                "version": 1,
-                "gestures": self.gestures
-            })
+            logger.error("Error loading gestures from %s: %s", self.db_path, e)
+            logger.info("Initializing with default gestures")
+            return default_gestures, True
 
-    def _save_gestures(self, data: Dict[str, Any]) -> bool:
-        """Save gestures to the database file."""
-        try:
-            with open(self.db_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            return True
-        except Exception as e:
-            print(f"Error saving gestures: {e}")
-            return False
-
-    def load_gestures(self) -> None:
-        """Load gestures from the database file."""
+    def _landmarks_path(self, generation: Optional[str] = None) -> str:
+        """Path of the .npy sidecar holding the landmark matrix of a save generation."""
+        base = os.path.splitext(self.db_path)[0] + '.landmarks'
+        if generation is None:
+            # Version 2 files used a single fixed sidecar
+            return base + '.npy'
+        return f"{base}.{generation}.npy"
+    
+    def _remove_stale_sidecars(self, generation: str) -> None:
+        """Delete sidecars of earlier saves once the index no longer refers to them."""
+        current = os.path.basename(self._landmarks_path(generation))
+        prefix = os.path.basename(os.path.splitext(self.db_path)[0]) + '.landmarks'
+        directory = os.path.dirname(self.db_path)
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith('.npy') and name != current:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError as e:
+                    logger.warning("Could not remove old landmarks file %s: %s", name, e)
+    
+    def _backup_db_file(self) -> None:
+        """Copy the database file aside before it's rewritten with gestures missing."""
+        backup_path = self.db_path + '.bak'
         try:
-            with open(self.db_path, 'r') as f:
-                data = json.load(f)
-                self.gestures = data.get('gestures', {})
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.gestures = self._get_default_gestures()
-            self._save_gestures({"version": 1, "gestures": self.gestures})
-
-    def add_gesture(self, gesture_id: str, name: str, landmarks: list, message: str) -> bool:
-        """Add or update a gesture in the database."""
-        self.gestures[gesture_id] = {
-            "name": name,
-            "landmarks": landmarks,
-            "message": message,
-            "created_at": int(time.time())
-        }
-        return self._save_gestures({"version": 1, "gestures": self.gestures})
-
-    def delete_gesture(self, gesture_id: str) -> bool:
-        """Delete a gesture from the database."""
-        if gesture_id in self.gestures:
-            del self.gestures[gesture_id]
-            return self._save_gestures({"version": 1, "gestures": self.gestures})
-        return False
-
-    def get_gesture(self, gesture_id: str) -> Optional[Dict[str, Any]]:
-        """Get a gesture by its ID."""
-        return self.gestures.get(gesture_id)
-
-    def get_all_gestures(self) -> Dict[str, Dict[str, Any]]:
-        """Get all gestures."""
-        return self.gestures
-
-    def _normalize_landmarks(self, landmarks):
-        """Normalize landmarks to be invariant to scale and translation."""
-        landmarks = np.array(landmarks).reshape(-1, 3)
-        
-        # Center the landmarks around the wrist (first point)
-        wrist = landmarks[0].copy()
-        centered = landmarks - wrist
-        
-        # Scale based on the distance between wrist and middle finger MCP (base of middle finger)
-        scale = np.linalg.norm(centered[9])  # Index 9 is MCP of middle finger
-        if scale > 0:
-            centered = centered / scale
-            
-        return centered.flatten()
-        
-    def find_similar_gesture(self, landmarks: list, threshold: float = 0.6) -> Optional[Dict[str, Any]]:
+            shutil.copyfile(self.db_path, backup_path)
+            logger.warning("Saved a copy of the previous gesture database to %s", backup_path)
+        except OSError as e:
+            logger.error("Could not back up %s: %s", self.db_path, e)
+    
+    def _read_db_file(self):
         """
-        Find a gesture similar to the given landmarks.
-        Returns the most similar gesture if similarity is above threshold, else None.
+        Read the database file, attaching landmarks from the .npy sidecar.
         
-        Args:
-            landmarks: List of landmark coordinates [x1,y1,z1, x2,y2,z2, ...]
-            threshold: Minimum similarity score (0-1) to consider a match
-            
         Returns:
-            Dictionary containing gesture data if a match is found, None otherwise
+            Tuple of (gestures dict, file format version, ids of gestures whose
+            landmarks were in a sidecar that is missing or doesn't match the index)
         """
-        if not landmarks or not self.gestures:
-            return None
-
-        try:
-            # Normalize input landmarks
-            norm_landmarks = self._normalize_landmarks(landmarks)
-        except Exception as e:
-            print(f"Error normalizing landmarks: {e}")
-            return None
-
-        best_match = None
-        best_score = -1
-        best_gesture_id = None
-
-        for gesture_id, gesture in self.gestures.items():
-            if not gesture.get('landmarks') or len(gesture['landmarks']) == 0:
-                continue
-
+        with open(self.db_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if orjson is not None and size >= _MMAP_MIN_SIZE:
+                # orjson parses straight out of the mapping, without copying the file into a bytes object
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    data = _loads(view)
+            else:
+                data = _loads(f.read())
+            
+        # Handle different database formats
+        if not isinstance(data, dict):
+            raise ValueError("Invalid database format - expected a dictionary")
+        if 'gestures' in data and isinstance(data['gestures'], dict):
+            gestures = data['gestures']
+            version = data.get('version', 1)
+        else:
+            # Old format where the entire file is the gestures dict
+            gestures = data
+            version = 0
+            
+        # Gestures saved in the sidecar format refer to a row of the landmark matrix
+        indexed = {gesture_id: g for gesture_id, g in gestures.items()
+                   if isinstance(g, dict) and 'landmarks_row' in g}
+        lost = []
+        if indexed:
+            landmarks_path = self._landmarks_path(data.get('landmarks_generation'))
             try:
-                # Normalize stored gesture landmarks
-                stored_norm = self._normalize_landmarks(gesture['landmarks'])
-                
-                # Calculate distances between corresponding landmarks
-                diff = norm_landmarks - stored_norm
-                distances = np.linalg.norm(diff.reshape(-1, 3), axis=1)
-                
-                # Use mean of top 80% of distances to be robust to outliers
-                k = max(1, int(len(distances) * 0.8))
-                topk_distances = np.partition(distances, k-1)[:k]
-                avg_distance = np.mean(topk_distances)
-                
-                # Convert distance to similarity score (lower distance = higher score)
-                similarity = 1.0 / (1.0 + avg_distance)
-                
-                if similarity > best_score:
-                    best_score = similarity
-                    best_match = gesture.copy()
-                    best_gesture_id = gesture_id
-                    # Include the gesture ID in the returned dictionary
-                    best_match['id'] = gesture_id
+                matrix = np.load(landmarks_path)
+                if matrix.shape != (len(indexed), self._N_VALUES):
+                    raise ValueError(f"expected {len(indexed)} rows of {self._N_VALUES} values, "
+                                     f"got shape {matrix.shape}")
+            except (OSError, ValueError) as e:
+                logger.error("Error loading landmarks from %s: %s", landmarks_path, e)
+                matrix = None
+            for gesture_id, gesture in indexed.items():
+                row = gesture.pop('landmarks_row')
+                if matrix is not None and isinstance(row, int) and 0 <= row < len(matrix):
+                    gesture['landmarks'] = matrix[row]
+                elif not isinstance(gesture.get('landmarks'), list):
+                    # Nothing to fall back on, unlike landmarks still inline from an older file
+                    lost.append(gesture_id)
+            if lost:
+                logger.error("Landmarks of %d gestures could not be loaded: %s",
+                             len(lost), ", ".join(lost))
                     
-            except Exception as e:
-                print(f"Error comparing with gesture {gesture_id}: {e}")
-                continue
-
-        print(f"Best match score: {best_score:.3f} for gesture: {best_gesture_id}")
-        return best_match if best_score >= threshold else None
-
+        # Keep landmarks as float32 arrays in memory; inline JSON lists only come from
+        # older files and are converted once here
+        for gesture in gestures.values():
+            if isinstance(gesture, dict) and isinstance(gesture.get('landmarks'), list):
+                try:
+                    gesture['landmarks'] = np.asarray(gesture['landmarks'], dtype=np.float32)
+                except (TypeError, ValueError):
+                    pass  # Left as a list so validation reports it as invalid
+                    
+        return gestures, version, lost
+    
+    def _replace_file(self, temp_path: str, path: str) -> None:
+        """Move a fully written temp file over its destination."""
+        # Atomic on POSIX and Windows, so there's never a moment without a database file
+        os.replace(temp_path, path)
+        
+    @staticmethod
+    def _sync(f) -> None:
+        """Flush a file to disk before it's moved into place."""
+        f.flush()
+        os.fsync(f.fileno())
+    
     def _save_gestures(self, data: Dict[str, Any]) -> bool:
-        """Save gestures to the database file."""
+        """Save gestures to the database file, with landmarks in the .npy sidecar."""
+        # Create temporary files first to ensure atomic writes
+        temp_path = self.db_path + '.tmp'
+        # Each save writes a new sidecar, so the index on disk keeps pointing at the
+        # complete previous one until it is itself replaced
+        generation = f"{time.time_ns():x}"
+        landmarks_path = self._landmarks_path(generation)
+        landmarks_temp_path = landmarks_path + '.tmp'
         try:
-            # Create a temporary file first to ensure atomic write
-            temp_path = self.db_path + '.tmp'
+            # Split full 21-point landmark sets out into one float32 matrix
+            index = {}
+            rows = []
+            for gesture_id, gesture in data.get('gestures', {}).items():
+                entry = dict(gesture)
+                landmarks = entry.get('landmarks')
+                if landmarks is not None and len(landmarks) == self._N_VALUES:
+                    del entry['landmarks']
+                    entry['landmarks_row'] = len(rows)
+                    rows.append(landmarks)
+                index[gesture_id] = entry
+            matrix = np.asarray(rows, dtype=np.float32).reshape(-1, self._N_VALUES)
             
-            # Save with pretty printing for better readability
-            with open(temp_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                
-            # On Windows, we need to remove the destination file first if it exists
-            if os.path.exists(self.db_path):
-                os.remove(self.db_path)
-                
-            # Rename the temp file to the actual file
-            os.rename(temp_path, self.db_path)
+            # Write the sidecar first so the index never refers to rows that don't exist yet
+            with open(landmarks_temp_path, 'wb', buffering=1 << 16) as f:
+                np.save(f, matrix)
+                self._sync(f)
+            self._replace_file(landmarks_temp_path, landmarks_path)
+            
+            # Save the index with pretty printing for better readability
+            with open(temp_path, 'wb', buffering=1 << 16) as f:
+                f.write(_dumps({**data, "version": DB_VERSION, "landmarks_generation": generation,
+                                "gestures": index}))
+                self._sync(f)
+            self._replace_file(temp_path, self.db_path)
+            self._remove_stale_sidecars(generation)
             
-            print(f"Successfully saved {len(data.get('gestures', {}))} gestures to {self.db_path}")
+            logger.debug("Successfully saved %d gestures to %s", len(data.get('gestures', {})), self.db_path)
             return True
             
         except Exception as e:
-            print(f"Error saving gestures to {self.db_path}: {e}")
-            # Clean up temp file if it exists
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
+            logger.error("Error saving gestures to %s: %s", self.db_path, e)
+            # Clean up temp files if they exist
+            for path in (temp_path, landmarks_temp_path):
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except (OSError, ValueError) as e:
+                        logger.warning("Could not remove temp file %s: %s", path, e)
             return False
 
     def load_gestures(self) -> None:
         """Load gestures from the database file."""
+        with self._index_lock:
+            self._load_gestures()
+            
+    def _load_gestures(self) -> None:
+        """Load gestures from the database file; the caller holds _index_lock."""
         try:
-            if not os.path.exists(self.db_path):
+            try:
+                self.gestures, version, lost = self._read_db_file()
+            except FileNotFoundError:
                 # If file doesn't exist, initialize with default gestures
                 self.gestures = self._get_default_gestures()
-                self._save_gestures({"version": 1, "gestures": self.gestures})
+                self._queue_save()
+                self.flush()
+                self._rebuild_index()
                 return
+            
+            if lost:
+                self._backup_db_file()
                 
-            with open(self.db_path, 'r') as f:
-                data = json.load(f)
-                
-            # Handle different database formats
-            if isinstance(data, dict):
-                if 'gestures' in data and isinstance(data['gestures'], dict):
-                    self.gestures = data['gestures']
-                else:
-                    # Old format where the entire file is the gestures dict
-                    self.gestures = data
-            else:
-                raise ValueError("Invalid database format - expected a dictionary")
+            # Migrate older files, e.g. with landmarks inline as JSON floats
+            if version < DB_VERSION:
+                logger.info("Migrating gesture database to version %d", DB_VERSION)
+                self._queue_save()
+                self.flush()
                 
-        except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
-            print(f"Error loading gestures from {self.db_path}: {e}")
-            print("Initializing with default gestures")
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error("Error loading gestures from %s: %s", self.db_path, e)
+            logger.info("Initializing with default gestures")
             self.gestures = self._get_default_gestures()
-            self._save_gestures({"version": 1, "gestures": self.gestures})
+            self._queue_save()
+            self.flush()
+            
+        self._rebuild_index()
 
-    def add_gesture(self, gesture_id: str, name: str, landmarks: list, message: str) -> bool:
+    def add_gesture(self, gesture_id: str, name: str, landmarks, message: str) -> bool:
         """Add or update a gesture in the database."""
-        if not landmarks or len(landmarks) == 0:
-            print("Error: Cannot add gesture with empty landmarks")
+        if landmarks is None or len(landmarks) == 0:
+            logger.error("Cannot add gesture with empty landmarks")
             return False
             
-        self.gestures[gesture_id] = {
-            "name": name,
-            "landmarks": landmarks,
-            "message": message,
-            "created_at": int(time.time())
-        }
-        
-        # Save the updated gestures to the database file
-        return self._save_gestures({
-            "version": 1,
-            "gestures": self.gestures
-        })
+        with self._index_lock:
+            self.gestures[gesture_id] = {
+                "name": name,
+                "landmarks": np.asarray(landmarks, dtype=np.float32).ravel(),
+                "message": message,
+                "created_at": int(time.time())
+            }
+            self._index_gesture(gesture_id)
+            
+            # Save the updated gestures to the database file shortly, in the background
+            self._schedule_save()
+        return True
 
     def delete_gesture(self, gesture_id: str) -> bool:
         """Delete a gesture from the database."""
-        if gesture_id in self.gestures:
+        with self._index_lock:
+            if gesture_id not in self.gestures:
+                return False
             del self.gestures[gesture_id]
-            return self._save_gestures({
-                "version": 1,
-                "gestures": self.gestures
-            })
-        return False
+            self._index_gesture(gesture_id)
+            self._schedule_save()
+        return True
+        
+    def _queue_save(self) -> None:
+        """Hand a copy of the gestures to the next write; the caller holds _index_lock."""
+        # Snapshot on the editing thread, so the save never iterates the dict
+        # while it's being changed
+        snapshot = dict(self.gestures)
+        with self._save_lock:
+            self._save_snapshot = snapshot
+            self._save_seq += 1
+            self._save_pending = True
+            
+    def _schedule_save(self) -> None:
+        """(Re)start the timer that writes the database once edits settle; the caller holds _index_lock."""
+        self._queue_save()
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self._SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+            
+    def flush(self) -> bool:
+        """
+        Write any pending changes to disk now. Runs on the save timer and at exit.
+        
+        Returns:
+            True if there was nothing to save or the save succeeded
+        """
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._save_pending:
+                return True
+            self._save_pending = False
+            snapshot, seq = self._save_snapshot, self._save_seq
+            
+        # Write outside _save_lock, so edits meanwhile only queue a newer snapshot
+        with self._write_lock:
+            if seq <= self._saved_seq:
+                # A newer snapshot was written while this one waited
+                return True
+            saved = self._save_gestures({"version": DB_VERSION, "gestures": snapshot})
+            if saved:
+                self._saved_seq = seq
+                
+        if not saved:
+            with self._save_lock:
+                if self._save_seq == seq:
+                    # Keep it pending so the exit flush tries again
+                    self._save_pending = True
+        return saved
 
     def get_gesture(self, gesture_id: str) -> Optional[Dict[str, Any]]:
         """Get a gesture by its ID."""
         return self.gestures.get(gesture_id)
 
     def get_all_gestures(self) -> Dict[str, Dict[str, Any]]:
-        """Get all gestures."""
-        return self.gestures
+        """Get all gestures, as a copy the caller can iterate while others edit."""
+        with self._index_lock:
+            return dict(self.gestures)
 
-    def _normalize_landmarks(self, landmarks):
-        """Normalize landmarks to be invariant to scale and translation."""
-        landmarks = np.array(landmarks).reshape(-1, 3)
+    def _normalize_landmarks(self, landmarks: np.ndarray) -> np.ndarray:
+        """
+        Normalize landmarks to be invariant to scale and translation.
+        
+        Args:
+            landmarks: Flat float ndarray of 21 points [x1,y1,z1, x2,y2,z2, ...];
+                       callers convert lists with np.asarray once at the public API
+            
+        Returns:
+            Normalized landmarks as a (21, 3) array. This is a scratch buffer that
+            the next call overwrites, so copy it to keep it.
+        """
+        landmarks = landmarks.reshape(self._SHAPE)
+        out = self._norm_scratch
     
         # Center the landmarks around the wrist (first point)
-        wrist = landmarks[0].copy()
-        centered = landmarks - wrist
+        np.subtract(landmarks, landmarks[0], out=out)
         
         # Scale based on the distance between wrist and middle finger MCP (base of middle finger)
-        scale = np.linalg.norm(centered[9])  # Index 9 is MCP of middle finger
-        if scale > 0:
-            centered = centered / scale
+        x, y, z = out[self._MIDDLE_MCP]
+        scale = math.sqrt(x * x + y * y + z * z)
+        if scale > self._INV_SCALE_EPS:
+            np.multiply(out, 1.0 / scale, out=out)
+            
+        return out
+        
+    def _rebuild_index(self) -> None:
+        """Normalize every stored gesture once and stack them for matching."""
+        gesture_ids = []
+        rows = []
+        for gesture_id, gesture in self.gestures.items():
+            landmarks = gesture.get('landmarks')
+            # Only full 21-point hands can be compared with MediaPipe output
+            if landmarks is None or len(landmarks) != self._N_VALUES:
+                continue
+            try:
+                # Copy out of the scratch buffer that _normalize_landmarks reuses
+                rows.append(self._normalize_landmarks(np.asarray(landmarks, dtype=np.float32)).copy())
+                gesture_ids.append(gesture_id)
+            except Exception as e:
+                logger.error("Error normalizing gesture %s: %s", gesture_id, e)
+                
+        self._gesture_ids = gesture_ids
+        if rows:
+            self._norm_matrix = np.stack(rows).astype(np.float32)
+        else:
+            self._norm_matrix = np.empty((0, *self._SHAPE), dtype=np.float32)
+        self._index_changed()
+        
+    def _index_gesture(self, gesture_id: str) -> None:
+        """Update the index for one added, changed or deleted gesture without a full rebuild."""
+        gesture = self.gestures.get(gesture_id)
+        landmarks = gesture.get('landmarks') if gesture is not None else None
+        row = None
+        if landmarks is not None and len(landmarks) == self._N_VALUES:
+            row = self._normalize_landmarks(np.asarray(landmarks, dtype=np.float32))
             
-        return centered.flatten()
+        if gesture_id in self._gesture_ids:
+            idx = self._gesture_ids.index(gesture_id)
+            if row is not None:
+                self._norm_matrix[idx] = row
+            else:
+                del self._gesture_ids[idx]
+                self._norm_matrix = np.delete(self._norm_matrix, idx, axis=0)
+        elif row is not None:
+            self._gesture_ids.append(gesture_id)
+            self._norm_matrix = np.vstack([self._norm_matrix, row[np.newaxis]])
+        self._index_changed()
         
-    def find_similar_gesture(self, landmarks: list, threshold: float = 0.6) -> Optional[Dict[str, Any]]:
+    def _index_changed(self) -> None:
+        """Reset matcher state that depends on the rows of the index."""
+        # Weighted squared distance expands to |a|^2_w - 2 a.(w*q) + |q|^2_w, so the
+        # per-gesture terms are computed here once and a frame costs one gemv
+        n = len(self._gesture_ids)
+        flat = self._norm_matrix.reshape(n, self._N_VALUES)
+        self._weighted_matrix = flat * self._COORD_WEIGHTS
+        self._weighted_sq_norms = np.einsum('ni,ni->n', self._weighted_matrix, flat)
+        # Scratch buffer for find_similar_gesture, so the per-frame scan doesn't allocate
+        self._scores = np.empty(n, dtype=np.float32)
+        self._recent_matches = []
+        info = self._match_cached.cache_info()
+        if info.hits or info.misses:
+            logger.debug("Match cache reset after %d hits, %d misses", info.hits, info.misses)
+        self._match_cached.cache_clear()
+        
+    def find_similar_gesture(self, landmarks, threshold: float = 0.6) -> Optional[Dict[str, Any]]:
         """
         Find a gesture similar to the given landmarks.
         Returns the most similar gesture if similarity is above threshold, else None.
         
         Args:
-            landmarks: List of landmark coordinates [x1,y1,z1, x2,y2,z2, ...]
+            landmarks: Landmark coordinates [x1,y1,z1, x2,y2,z2, ...] as a list or ndarray
             threshold: Minimum similarity score (0-1) to consider a match
             
         Returns:
             Dictionary containing gesture data if a match is found, None otherwise
         """
-        if not landmarks or not self.gestures:
+        # Matching runs on the inference thread while gestures are edited on the UI
+        # thread; the lock keeps it from seeing a half-updated index
+        with self._index_lock:
+            return self._find_similar_gesture(landmarks, threshold)
+        
+    def _find_similar_gesture(self, landmarks, threshold: float) -> Optional[Dict[str, Any]]:
+        """find_similar_gesture() body; the caller holds _index_lock."""
+        if landmarks is None or len(landmarks) == 0 or not self._gesture_ids:
+            return None
+            
+        if len(landmarks) != self._N_VALUES:
+            logger.warning("Expected %d landmark values, got %d", self._N_VALUES, len(landmarks))
             return None
 
         try:
-            # Normalize input landmarks
-            norm_landmarks = self._normalize_landmarks(landmarks)
+            # Normalize input landmarks (no copy if they're already a float32 array)
+            norm_landmarks = self._normalize_landmarks(np.asarray(landmarks, dtype=np.float32))
         except Exception as e:
-            print(f"Error normalizing landmarks: {e}")
+            logger.error("Error normalizing landmarks: %s", e)
             return None
 
-        best_match = None
-        best_score = -1
-        best_gesture_id = None
+        # Consecutive webcam frames often quantize to the same key, which skips scoring
+        # (quantized in place: norm_landmarks is the normalization scratch buffer)
+        quantized = np.multiply(norm_landmarks, self._FINGERPRINT_SCALE, out=norm_landmarks)
+        np.rint(quantized, out=quantized)
+        np.copyto(self._fingerprint_buf, quantized, casting='unsafe')
+        # A hand usually holds the same gesture for many frames, so try the recent
+        # matches on their own first and skip the full scan on a near-perfect fit.
+        # This stays outside the cache, whose results depend only on the key.
+        match = self._match_recent(quantized.reshape(-1) * np.float32(1.0 / self._FINGERPRINT_SCALE))
+        if match is None:
+            match = self._match_cached(self._fingerprint_buf.tobytes())
+        best, best_score = match
+        best_gesture_id = self._gesture_ids[best]
 
-        for gesture_id, gesture in self.gestures.items():
-            if not gesture.get('landmarks') or len(gesture['landmarks']) == 0:
-                continue
-
-            try:
-                # Normalize stored gesture landmarks
-                stored_norm = self._normalize_landmarks(gesture['landmarks'])
-                
-                # Calculate distances between corresponding landmarks
-                diff = norm_landmarks - stored_norm
-                distances = np.linalg.norm(diff.reshape(-1, 3), axis=1)
-                
-                # Use mean of top 80% of distances to be robust to outliers
-                k = max(1, int(len(distances) * 0.8))
-                topk_distances = np.partition(distances, k-1)[:k]
-                avg_distance = np.mean(topk_distances)
-                
-                # Convert distance to similarity score (lower distance = higher score)
-                similarity = 1.0 / (1.0 + avg_distance)
-                
-                if similarity > best_score:
-                    best_score = similarity
-                    best_match = gesture.copy()
-                    best_gesture_id = gesture_id
-                    # Include the gesture ID in the returned dictionary
-                    best_match['id'] = gesture_id
-                        
-            except Exception as e:
-                print(f"Error comparing with gesture {gesture_id}: {e}")
-                continue
-
-        print(f"Best match score: {best_score:.3f} for gesture: {best_gesture_id}")
-        return best_match if best_score >= threshold else None
\ No newline at end of file
+        logger.debug("Best match score: %.3f for gesture: %s", best_score, best_gesture_id)
+        if best_score < threshold:
+            # Keep the recent matches: another hand in the same frame may still be holding one
+            return None
+            
+        recent = self._recent_matches
+        if best in recent:
+            recent.remove(best)
+        recent.insert(0, best)
+        del recent[self._RECENT_MATCHES:]
+        # Include the gesture ID in the returned dictionary
+        best_match = self.gestures[best_gesture_id].copy()
+        best_match['id'] = best_gesture_id
+        return best_match
+        
+    def _match_recent(self, query: np.ndarray):
+        """
+        Score a flat normalized query against the recent matches only.
+        
+        Returns:
+            (index row, score) of the first recent match scoring at least
+            _EARLY_EXIT_SCORE, or None if the full index has to be scanned
+        """
+        query_sq_norm = None
+        for candidate in self._recent_matches:
+            if query_sq_norm is None:
+                query_sq_norm = float((query * self._COORD_WEIGHTS) @ query)
+            sq_dist = (float(self._weighted_sq_norms[candidate]) + query_sq_norm
+                       - 2.0 * float(self._weighted_matrix[candidate] @ query))
+            score = 1.0 / (1.0 + math.sqrt(max(sq_dist, 0.0)))
+            if score >= self._EARLY_EXIT_SCORE:
+                return candidate, score
+        return None
+        
+    def _match_fingerprint(self, fingerprint: bytes):
+        """Score quantized normalized landmarks against the whole index; cached per instance."""
+        query = np.frombuffer(fingerprint, dtype=np.int16) * np.float32(1.0 / self._FINGERPRINT_SCALE)
+        weighted_query = query * self._COORD_WEIGHTS
+        query_sq_norm = float(weighted_query @ query)
+        
+        # Weighted mean squared distance to every gesture at once, down-weighting
+        # the noisy fingertips, in the preallocated buffer. Ranking happens in
+        # squared space; only the winner's score needs a sqrt. Each index element
+        # is read once per query, so the BLAS gemv streams the matrix and
+        # splitting it into cache-sized tiles here would only add Python overhead.
+        sq_mean = np.dot(self._weighted_matrix, query, out=self._scores)
+        sq_mean *= -2.0
+        sq_mean += self._weighted_sq_norms
+        
+        best = int(np.argmin(sq_mean))
+        
+        # Convert the root-mean-square distance to a similarity score (lower distance = higher score);
+        # the clamp absorbs rounding when the query sits on a stored gesture
+        sq_best = max(float(sq_mean[best]) + query_sq_norm, 0.0)
+        best_score = 1.0 / (1.0 + math.sqrt(sq_best))
+        return best, best_score
@@ -1,9 +1,102 @@
 import cv2
+import logging
+import math
+import operator
+from collections import deque
+from itertools import chain
 import mediapipe as mp
 import numpy as np
 import config
 from typing import Dict, List, Tuple, Optional, Any
 
+logger = logging.getLogger(__name__)
+
+# Landmarks that fix a hand's orientation: wrist, thumb CMC, index MCP and pinky MCP
+_REFERENCE_POINTS = [0, 1, 5, 17]
+_MIDDLE_MCP = 9
+# Reads (x, y, z) or (x, y) off a landmark in one C-level call
+_LANDMARK_XYZ = operator.attrgetter('x', 'y', 'z')
+_LANDMARK_XY = operator.attrgetter('x', 'y')
+
+
+def _center_and_scale(points: np.ndarray) -> np.ndarray:
+    """Move the wrist to the origin and scale the wrist-to-middle-MCP length to 1."""
+    centered = points - points[0]
+    x, y, z = centered[_MIDDLE_MCP]
+    scale = math.sqrt(x * x + y * y + z * z)
+    return centered / scale if scale > 0 else centered
+
+
+# Canonical orientation, taken from the reference points of the first (open palm) template
+_CANONICAL_REFERENCE = _center_and_scale(config.GESTURE_TEMPLATES[0])[_REFERENCE_POINTS]
+
+# The canonical reference points scattered into a (21, 3) matrix that is zero
+# elsewhere, so the cross-covariance with a hand's reference points is a single
+# product over all 21 (no gather of the 4 rows each frame)
+_REFERENCE_TARGET = np.zeros((21, 3), dtype=np.float32)
+_REFERENCE_TARGET[_REFERENCE_POINTS] = _CANONICAL_REFERENCE
+
+
+def _canonical_pose(points: np.ndarray) -> np.ndarray:
+    """
+    Map a (21, 3) hand to the canonical pose: wrist at the origin, unit
+    wrist-to-middle-MCP length, and reference points rotated onto the canonical ones.
+    
+    The rotation is the Kabsch solution for the 4 reference points, corrected to a
+    proper rotation (det +1), so a hand is never mirrored onto a template. The
+    templates are flat, so a mirrored (left vs right) hand still lines up with them
+    by being turned over, with its depth coming out negated.
+    """
+    centered = points - points[0]
+    
+    # Scaling the hand only scales the singular values of the 3x3 cross-covariance,
+    # so the rotation can be solved on the unscaled points
+    u, _, vt = np.linalg.svd(centered.T @ _REFERENCE_TARGET)
+    if np.linalg.det(u) * np.linalg.det(vt) < 0:
+        # Flip the axis of the smallest singular value rather than reflecting
+        u[:, 2] = -u[:, 2]
+    transform = u @ vt
+    
+    # Fold the scale into the 3x3 transform, so all 21 points go through one product
+    x, y, z = centered[_MIDDLE_MCP]
+    scale = math.sqrt(x * x + y * y + z * z)
+    if scale > 0:
+        transform /= scale
+    return centered @ transform
+
+
+# Gesture templates in canonical pose, flattened to (K, 63), and their squared
+# norms; computed once at import
+_CANONICAL_TEMPLATES = np.stack([_canonical_pose(t) for t in config.GESTURE_TEMPLATES]).reshape(len(config.GESTURE_TEMPLATES), -1)
+_TEMPLATE_SQ_NORMS = np.einsum('ij,ij->i', _CANONICAL_TEMPLATES, _CANONICAL_TEMPLATES)
+
+
+def _recognize_gesture_core(landmarks_flat: np.ndarray, templates: np.ndarray,
+                            template_sq_norms: np.ndarray, max_sq_dist: float) -> int:
+    """
+    Numeric part of gesture recognition, kept free of tracker state.
+    
+    Args:
+        landmarks_flat: 63 float values [x1,y1,z1, x2,y2,z2, ...]
+        templates: (K, 63) gesture templates in canonical pose
+        template_sq_norms: Squared norm of each template row
+        max_sq_dist: Largest summed squared landmark distance that still counts as a match
+        
+    Returns:
+        Index of the closest gesture template, or -1 if none is close enough
+    """
+    pose = _canonical_pose(landmarks_flat.reshape(21, 3)).ravel()
+    
+    # Squared distance to every template as |t|^2 - 2 t.p + |p|^2: one matrix-vector
+    # product, without building a (K, 63) difference array
+    sq_dist = templates @ pose
+    sq_dist *= -2
+    sq_dist += template_sq_norms
+    sq_dist += pose @ pose
+    best = int(np.argmin(sq_dist))
+    return best if sq_dist[best] <= max_sq_dist else -1
+
+
 class HandTracker:
     def __init__(self):
         """Initialize the hand tracker with MediaPipe Hands."""
@@ -16,185 +109,217 @@ class HandTracker:
         )
         self.mp_draw = mp.solutions.drawing_utils
         
+        # Landmark and connection drawing specs per gesture color, built once
+        # instead of on every draw call
+        self._default_specs = self._make_draw_specs((255, 255, 255))  # Default white
+        self._draw_specs = {
+            gesture: self._make_draw_specs(params['color'])
+            for gesture, params in config.GESTURE_TYPES.items()
+        }
+        
+        # Gesture ids in template order, and the RMS distance cutoff converted to a
+        # summed squared distance so matching needs no sqrt
+        self._gesture_ids = config.GESTURE_IDS
+        self._max_sq_dist = 21 * config.GESTURE_TEMPLATE_MAX_DIST ** 2
+        
+        # Label sizes for the fixed font and scale, measured once per gesture name
+        self._text_sizes = {
+            params['name']: cv2.getTextSize(params['name'], cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+            for params in config.GESTURE_TYPES.values()
+        }
+        
+        # Reused downscaled and RGB copies of the incoming frame, reallocated only if the size changes
+        self._small_buf = None
+        self._rgb_buf = None
+        
+        # Inference runs on every HAND_INFERENCE_STRIDE-th frame; frames in between
+        # reuse the last result while the hands are holding still, judged by how far
+        # their landmarks moved between the last two inferences.
+        # MediaPipe itself (static_image_mode=False) already crops to the ROI of the
+        # previous landmarks and only reruns palm detection when tracking is lost
+        self._frame_counter = 0
+        self._last_results = None
+        self._last_points = None  # (hands, 21, 2) normalized x, y from the last inference
+        self._hands_steady = False
+        
         # Store the last recognized gestures to smooth out detection
         self.last_gestures = []
-        self.gesture_history = []
         self.history_length = 5  # Number of frames to consider for smoothing
+        self.gesture_history = deque(maxlen=self.history_length)
+        # Occurrences of each gesture in gesture_history, kept in step with it
+        self._history_counts: Dict[str, int] = {}
     
     def process_frame(self, frame):
         """Process a frame and return hand landmarks."""
         if frame is None:
             return None
             
+        self._frame_counter += 1
+        if self._hands_steady and self._frame_counter % config.HAND_INFERENCE_STRIDE:
+            return self._last_results
+            
         try:
-            # Convert the BGR image to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Run inference on a smaller copy; the landmarks come back normalized to
+            # 0..1, so they still line up with the full-size frame for drawing
+            # (the models work on a ~200 px input anyway, whatever the camera resolution)
+            h, w = frame.shape[:2]
+            if w > config.HAND_INFERENCE_WIDTH:
+                scale = config.HAND_INFERENCE_WIDTH / w
+                small_shape = (max(1, int(h * scale)), config.HAND_INFERENCE_WIDTH) + frame.shape[2:]
+                if self._small_buf is None or self._small_buf.shape != small_shape:
+                    self._small_buf = np.empty(small_shape, dtype=np.uint8)
+                frame = cv2.resize(frame, (small_shape[1], small_shape[0]), dst=self._small_buf,
+                                   interpolation=cv2.INTER_AREA)
+                
+            # Convert the BGR image to RGB into the preallocated buffer
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty(frame.shape, dtype=np.uint8)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
             
-            # Process the frame and get hand landmarks
-            results = self.hands.process(rgb_frame)
+            # Process the frame and get hand landmarks; marking it read-only lets
+            # MediaPipe use it without an internal copy
+            rgb_frame.flags.writeable = False
+            try:
+                results = self.hands.process(rgb_frame)
+            finally:
+                rgb_frame.flags.writeable = True
             
             # Ensure we have valid hand landmarks
             if not hasattr(results, 'multi_hand_landmarks') or not results.multi_hand_landmarks:
-                return None
+                results = None
                 
+            self._last_results = results
+            self._hands_steady = self._update_hand_motion(results)
             return results
             
         except Exception as e:
-            print(f"Error in process_frame: {e}")
+            logger.exception("Error in process_frame")
+            self._last_results = None
+            self._last_points = None
+            self._hands_steady = False
             return None
     
+    def _update_hand_motion(self, results) -> bool:
+        """
+        Record where the hands' landmarks are and return True if they moved less than
+        HAND_REUSE_MAX_MOTION since the previous inference.
+        
+        The motion is the mean distance each landmark moved, in normalized image
+        coordinates. A change in the number or order of hands counts as moving.
+        """
+        hands = results.multi_hand_landmarks if results is not None else None
+        if not hands:
+            self._last_points = None
+            return False
+        points = np.stack([
+            np.fromiter(chain.from_iterable(map(_LANDMARK_XY, hand.landmark)),
+                        dtype=np.float32, count=2 * len(hand.landmark)).reshape(-1, 2)
+            for hand in hands
+        ])
+        prev, self._last_points = self._last_points, points
+        if prev is None or prev.shape != points.shape:
+            return False
+        motion = float(np.linalg.norm(points - prev, axis=2).mean())
+        return motion < config.HAND_REUSE_MAX_MOTION
+    
+    def _make_draw_specs(self, color):
+        """Return (landmark_spec, connection_spec) for drawing a hand in the given color."""
+        return (
+            self.mp_draw.DrawingSpec(color=color, thickness=2, circle_radius=2),
+            self.mp_draw.DrawingSpec(color=color, thickness=2)
+        )
+        
     def draw_landmarks(self, frame, hand_landmarks, recognized_gesture: str = None):
-        """Draw hand landmarks and recognized gesture on the frame."""
+        """
+        Draw one hand's landmarks and its recognized gesture on the frame.
+        
+        Args:
+            frame: BGR frame to draw on, in place
+            hand_landmarks: One entry of results.multi_hand_landmarks
+            recognized_gesture: Gesture type id from _recognize_gesture, if any
+        """
         if hand_landmarks is None:
             return frame
             
-        try:
-            # Get the color for the recognized gesture
-            gesture_color = (255, 255, 255)  # Default white
-            gesture_name = ""
-            
-            if recognized_gesture and recognized_gesture in config.GESTURE_TYPES:
-                gesture_color = config.GESTURE_TYPES[recognized_gesture]['color']
-                gesture_name = config.GESTURE_TYPES[recognized_gesture]['name']
+        # Get the drawing specs and label for the recognized gesture
+        landmark_spec, connection_spec = self._draw_specs.get(recognized_gesture, self._default_specs)
+        gesture = config.GESTURE_TYPES.get(recognized_gesture)
+        
+        # Draw landmarks and connections
+        self.mp_draw.draw_landmarks(
+            frame,
+            hand_landmarks,
+            self.mp_hands.HAND_CONNECTIONS,
+            landmark_drawing_spec=landmark_spec,
+            connection_drawing_spec=connection_spec
+        )
+        
+        # Add gesture name text
+        if gesture is not None and hand_landmarks.landmark:
+            gesture_name = gesture['name']
             
-            # Draw landmarks and connections
-            if hasattr(hand_landmarks, 'landmark'):
-                # Single hand
-                self.mp_draw.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    landmark_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=gesture_color,
-                        thickness=2,
-                        circle_radius=2
-                    ),
-                    connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                        color=gesture_color,
-                        thickness=2
-                    )
-                )
-                
-                # Add gesture name text
-                if gesture_name and hasattr(hand_landmarks, 'landmark') and hand_landmarks.landmark:
-                    # Get wrist position for text placement
-                    wrist = hand_landmarks.landmark[0]
-                    h, w, _ = frame.shape
-                    text_x = int(wrist.x * w) - 50
-                    text_y = int(wrist.y * h) - 20
-                    
-                    # Draw text with background for better visibility
-                    (text_w, text_h), _ = cv2.getTextSize(gesture_name, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
-                    cv2.rectangle(frame, (text_x, text_y - 25), (text_x + text_w, text_y + 5), (0, 0, 0), -1)
-                    cv2.putText(frame, gesture_name, (text_x, text_y),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            # Get wrist position for text placement
+            wrist = hand_landmarks.landmark[0]
+            h, w = frame.shape[:2]
+            text_x = int(wrist.x * w) - 50
+            text_y = int(wrist.y * h) - 20
             
-            elif hasattr(hand_landmarks, '__iter__'):
-                # Multiple hands
-                for landmarks in hand_landmarks:
-                    if hasattr(landmarks, 'landmark'):
-                        self.mp_draw.draw_landmarks(
-                            frame,
-                            landmarks,
-                            self.mp_hands.HAND_CONNECTIONS,
-                            landmark_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                                color=gesture_color,
-                                thickness=2,
-                                circle_radius=2
-                            ),
-                            connection_drawing_spec=mp.solutions.drawing_utils.DrawingSpec(
-                                color=gesture_color,
-                                thickness=2
-                            )
-                        )
-        except Exception as e:
-            print(f"Error drawing landmarks: {e}")
+            # Draw text with background for better visibility
+            text_w, text_h = self._text_sizes[gesture_name]
+            cv2.rectangle(frame, (text_x, text_y - 25), (text_x + text_w, text_y + 5), (0, 0, 0), -1)
+            cv2.putText(frame, gesture_name, (text_x, text_y),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             
         return frame
     
-    def _get_average_landmark_distance(self, landmarks):
-        """Calculate the average distance between all pairs of landmarks."""
-        if not landmarks or len(landmarks) < 2:
-            return 0.0
-            
-        distances = []
-        # Convert to numpy array for easier calculations
-        landmarks_np = np.array(landmarks).reshape(-1, 3)
-        
-        # Calculate pairwise distances between all landmarks
-        for i in range(len(landmarks_np)):
-            for j in range(i + 1, len(landmarks_np)):
-                dist = np.linalg.norm(landmarks_np[i] - landmarks_np[j])
-                distances.append(dist)
-                
-        return np.mean(distances) if distances else 0.0
-        
     def _recognize_gesture(self, landmarks) -> str:
-        """Recognize the gesture based on landmark distances."""
-        if not landmarks or len(landmarks) < 21 * 3:  # 21 landmarks * 3 coordinates each
+        """Recognize the gesture by comparing the canonical hand pose with each gesture's template."""
+        if landmarks is None or len(landmarks) < 21 * 3:  # 21 landmarks * 3 coordinates each
             return "unknown"
             
         try:
-            # Reshape landmarks to 21x3 array (21 landmarks with x,y,z coordinates)
-            landmarks_np = np.array(landmarks).reshape(-1, 3)
-            
-            # Calculate hand span (distance between wrist and middle finger tip)
-            wrist = landmarks_np[0]  # Wrist is the first landmark
-            middle_tip = landmarks_np[12]  # Middle finger tip
-            hand_span = np.linalg.norm(wrist - middle_tip)
-            
-            # Calculate average distance between landmarks
-            avg_dist = self._get_average_landmark_distance(landmarks)
+            # 21 landmarks with x,y,z coordinates; get_landmarks_list output is used as is
+            landmarks_np = np.asarray(landmarks, dtype=np.float32)[:21 * 3]
+            best = _recognize_gesture_core(landmarks_np, _CANONICAL_TEMPLATES, _TEMPLATE_SQ_NORMS,
+                                           self._max_sq_dist)
+            best_match = self._gesture_ids[best] if best >= 0 else "unknown"
             
-            # Normalize the average distance by hand span
-            normalized_dist = avg_dist / hand_span if hand_span > 0 else 0
-            
-            # Match against known gesture types
-            best_match = "unknown"
-            min_diff = float('inf')
-            
-            for gesture_type, params in config.GESTURE_TYPES.items():
-                # Check if the normalized distance is within the expected range
-                if params['min_landmark_dist'] <= normalized_dist <= params['max_landmark_dist']:
-                    # Calculate how close we are to the middle of the range
-                    mid_range = (params['min_landmark_dist'] + params['max_landmark_dist']) / 2
-                    diff = abs(normalized_dist - mid_range)
-                    
-                    if diff < min_diff:
-                        min_diff = diff
-                        best_match = gesture_type
-            
-            # Update gesture history for smoothing
+            # Update gesture history for smoothing; the deque drops the oldest entry itself
+            counts = self._history_counts
+            if len(self.gesture_history) == self.history_length:
+                evicted = self.gesture_history[0]
+                counts[evicted] -= 1
+                if not counts[evicted]:
+                    del counts[evicted]
             self.gesture_history.append(best_match)
-            if len(self.gesture_history) > self.history_length:
-                self.gesture_history.pop(0)
-                
+            counts[best_match] = counts.get(best_match, 0) + 1
+            
             # Return the most common gesture in history for stability
-            if self.gesture_history:
-                from collections import Counter
-                return Counter(self.gesture_history).most_common(1)[0][0]
-                
-            return best_match
+            # (ties go to the one seen first, as with Counter.most_common)
+            return max(self.gesture_history, key=counts.__getitem__)
             
         except Exception as e:
-            print(f"Error in _recognize_gesture: {e}")
+            logger.exception("Error in _recognize_gesture")
             return "unknown"
     
-    def get_landmarks_list(self, hand_landmarks):
-        """Convert hand landmarks to a flat list of coordinates."""
+    def get_landmarks_list(self, hand_landmarks) -> Optional[np.ndarray]:
+        """Convert hand landmarks to a flat float32 array of coordinates [x1,y1,z1, x2,y2,z2, ...]."""
         if not hand_landmarks:
             return None
             
-        landmarks_list = []
         try:
-            # Access the landmark property of the hand_landmarks object
-            for landmark in hand_landmarks.landmark:
-                landmarks_list.extend([landmark.x, landmark.y, landmark.z])
-            return landmarks_list
+            # Access the landmark property of the hand_landmarks object and fill
+            # the array in one pass, without an intermediate list of floats or a
+            # Python-level generator
+            landmarks = hand_landmarks.landmark
+            return np.fromiter(
+                chain.from_iterable(map(_LANDMARK_XYZ, landmarks)),
+                dtype=np.float32,
+                count=3 * len(landmarks)
+            )
         except AttributeError as e:
-            print(f"Error processing landmarks: {e}")
-            print(f"Landmarks object type: {type(hand_landmarks)}")
-            print(f"Available attributes: {dir(hand_landmarks) if hasattr(hand_landmarks, '__dir__') else 'N/A'}")
+            logger.warning("Error processing landmarks of type %s: %s", type(hand_landmarks).__name__, e)
+            logger.debug("Available attributes: %s", dir(hand_landmarks))
             return None
     
     def release(self):
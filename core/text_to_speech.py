@@ -1,19 +1,55 @@
 from gtts import gTTS
 import pygame
+import hashlib
+import io
+import logging
 import os
 import tempfile
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Set
 import config  # Import the config module directly
 
+try:
+    # Optional: offline speech synthesis (SAPI5 / NSSpeechSynthesizer / eSpeak)
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+logger = logging.getLogger(__name__)
+
 class TextToSpeech:
     def __init__(self):
         """Initialize the text-to-speech engine."""
         pygame.mixer.init()
-        self.temp_files = []
+        
+        # Synthesis is a network round-trip to Google, so it runs on one worker
+        # thread (keeping messages in order) instead of blocking the caller
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tts')
+        # Phrases queued on the worker but not started yet; a repeat of one of these
+        # is dropped instead of being spoken twice in a row
+        self._pending: Set[Path] = set()
+        self._pending_lock = threading.Lock()
+        
+        # Generated speech is kept by content, so repeated messages skip the network
+        self._cache_dir = Path(tempfile.gettempdir()) / 'gesture_tts_cache'
+        self._cache_dir.mkdir(exist_ok=True)
+        
+        # Decoded sounds by file path, so each phrase is read and decoded once.
+        # Only touched from the worker thread.
+        self._sound_cache: Dict[str, pygame.mixer.Sound] = {}
+        
+        # Local engine, only if opted into with TTS_BACKEND and installed; gTTS is
+        # the default and the fallback. The engine is created on the worker thread,
+        # which is the only one that uses it.
+        self._use_offline = config.TTS_BACKEND == 'pyttsx3' and pyttsx3 is not None
+        self._engine = None
+        self._engine_rate = None
         
     def speak(self, text: str, language: str = None, slow: bool = None) -> bool:
         """
-        Convert text to speech and play it.
+        Convert text to speech and play it in the background.
         
         Args:
             text: The text to be spoken
@@ -21,7 +57,7 @@ class TextToSpeech:
             slow: Whether to speak slowly
             
         Returns:
-            bool: True if speech was generated and played successfully, False otherwise
+            bool: True if speech was queued for playback, False otherwise
         """
         if not text:
             return False
@@ -29,32 +65,96 @@ class TextToSpeech:
         language = language or config.TTS_LANGUAGE
         slow = slow if slow is not None else config.TTS_SLOW
         
-        # Clean up any old temporary files that are no longer in use
-        self.cleanup()
-        
+        cached = self._cache_path(text, language, slow)
+        with self._pending_lock:
+            if cached in self._pending:
+                return True
+            self._pending.add(cached)
+            
         try:
-            # Create a temporary file for the speech
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as fp:
-                temp_file = fp.name
+            if self._use_offline:
+                self._executor.submit(self._run_pending, cached, self._speak_offline,
+                                      text, language, slow, cached)
+            elif cached.exists():
+                self._executor.submit(self._run_pending, cached, self._play_audio, str(cached))
+            else:
+                self._executor.submit(self._run_pending, cached, self._synthesize_and_play,
+                                      text, language, slow, cached)
+            return True
+        except RuntimeError as e:
+            # The executor was shut down
+            with self._pending_lock:
+                self._pending.discard(cached)
+            logger.warning("Error in text-to-speech: %s", e)
+            return False
             
-            # Generate speech
-            tts = gTTS(text=text, lang=language, slow=slow)
-            tts.save(temp_file)
-            self.temp_files.append(temp_file)
+    def _run_pending(self, key: Path, func, *args) -> None:
+        """Mark a queued phrase as started, then run it. Runs on the worker thread."""
+        with self._pending_lock:
+            self._pending.discard(key)
+        func(*args)
+        
+    def _cache_path(self, text: str, language: str, slow: bool) -> Path:
+        """Path of the cached MP3 for this text and voice settings."""
+        key = hashlib.blake2b(f"{text}|{language}|{slow}".encode('utf-8'), digest_size=16).hexdigest()
+        return self._cache_dir / f"{key}.mp3"
+        
+    def _speak_offline(self, text: str, language: str, slow: bool, cached: Path) -> None:
+        """Speak with the local engine, falling back to gTTS if it fails. Runs on the worker thread."""
+        try:
+            if self._engine is None:
+                self._engine = pyttsx3.init()
+                self._engine_rate = self._engine.getProperty('rate')
+            self._engine.setProperty('rate', int(self._engine_rate * 0.6) if slow else self._engine_rate)
+            self._engine.say(text)
+            self._engine.runAndWait()
+        except Exception as e:
+            logger.warning("Error in offline text-to-speech, switching to gTTS: %s", e)
+            self._use_offline = False
+            self._synthesize_and_play(text, language, slow, cached)
             
-            # Play the speech
-            self._play_audio(temp_file)
-            return True
+    def _synthesize_and_play(self, text: str, language: str, slow: bool, cached: Path) -> None:
+        """Generate speech, cache it and play it. Runs on the worker thread."""
+        # An earlier queued request may have generated the same message already
+        if cached.exists():
+            self._play_audio(str(cached))
+            return
             
+        try:
+            # Generate speech straight into memory
+            buf = io.BytesIO()
+            gTTS(text=text, lang=language, slow=slow).write_to_fp(buf)
         except Exception as e:
-            print(f"Error in text-to-speech: {e}")
-            # Clean up the temp file if we created it but failed to use it
+            logger.exception("Error in text-to-speech")
+            return
+            
+        # Decode from the in-memory bytes rather than reading the file back
+        try:
+            buf.seek(0)
+            self._sound_cache[str(cached)] = pygame.mixer.Sound(file=buf)
+        except pygame.error:
+            pass  # _play_audio streams the cached file instead
+            
+        self._write_cache(cached, buf.getvalue())
+        
+        # Play the speech
+        self._play_audio(str(cached))
+        
+    def _write_cache(self, cached: Path, data: bytes) -> None:
+        """Store generated speech for later runs, without ever exposing a partial file."""
+        temp_file = None
+        try:
+            with tempfile.NamedTemporaryFile(suffix='.mp3', dir=self._cache_dir, delete=False) as fp:
+                temp_file = fp.name
+                fp.write(data)
+            os.replace(temp_file, cached)
+        except OSError as e:
+            logger.warning("Could not cache speech: %s", e)
             try:
-                if 'temp_file' in locals() and os.path.exists(temp_file):
+                if temp_file is not None and os.path.exists(temp_file):
                     os.unlink(temp_file)
-            except:
+            except OSError:
                 pass
-            return False
     
     def _play_audio(self, file_path: str) -> None:
         """Play an audio file using pygame."""
@@ -62,60 +162,63 @@ class TextToSpeech:
             # Initialize pygame mixer if not already done
             if not pygame.mixer.get_init():
                 pygame.mixer.init()
+                
+            # Stop anything still playing from the previous message
+            pygame.mixer.stop()
+            pygame.mixer.music.stop()
             
-            # Unload any currently playing audio
-            try:
-                pygame.mixer.music.stop()
-                pygame.mixer.music.unload()
-            except:
-                pass
-            
-            # Give the system a moment to release the file
-            pygame.time.delay(100)
-            
-            # Load and play the new audio
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-            
+            sound = self._sound_cache.get(file_path)
+            if sound is None:
+                try:
+                    sound = pygame.mixer.Sound(file_path)
+                except pygame.error:
+                    # This SDL_mixer build can't decode MP3 into a Sound; stream it instead
+                    self._play_music(file_path)
+                    return
+                self._sound_cache[file_path] = sound
+                
             # Don't wait for the audio to finish - let it play in the background
-            # The file will be cleaned up when the application exits or when cleanup() is called
+            sound.play()
             
         except Exception as e:
-            print(f"Error playing audio: {e}")
+            logger.exception("Error playing audio")
             # Try to reinitialize the mixer if there was an error
             try:
                 pygame.mixer.quit()
                 pygame.mixer.init()
+                # Sounds belong to the old mixer
+                self._sound_cache.clear()
             except Exception as e:
-                print(f"Error reinitializing mixer: {e}")
+                logger.exception("Error reinitializing mixer")
+                
+    def _play_music(self, file_path: str) -> None:
+        """Stream an audio file through pygame.mixer.music."""
+        # Unload any currently playing audio
+        try:
+            pygame.mixer.music.stop()
+            pygame.mixer.music.unload()
+        except:
+            pass
+        
+        # Give the system a moment to release the file
+        pygame.time.delay(100)
+        
+        # Load and play the new audio
+        pygame.mixer.music.load(file_path)
+        pygame.mixer.music.play()
     
     def cleanup(self) -> None:
-        """Clean up temporary files."""
-        # Stop any currently playing audio
+        """Stop any currently playing audio."""
         try:
             if pygame.mixer.get_init():
+                pygame.mixer.stop()
                 pygame.mixer.music.stop()
-                pygame.mixer.music.unload()
-                # Give the system a moment to release the file
-                pygame.time.delay(100)
         except Exception as e:
-            print(f"Error stopping audio during cleanup: {e}")
-        
-        # Clean up temporary files
-        remaining_files = []
-        for file_path in self.temp_files:
-            try:
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-            except Exception as e:
-                print(f"Warning: Could not delete {file_path}: {e}")
-                # If we couldn't delete it now, we'll try again later
-                remaining_files.append(file_path)
-        
-        self.temp_files = remaining_files
+            logger.warning("Error stopping audio during cleanup: %s", e)
     
     def __del__(self):
         """Clean up resources."""
+        self._executor.shutdown(wait=False)
         self.cleanup()
         try:
             pygame.mixer.quit()
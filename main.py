@@ -1,6 +1,8 @@
+import logging
 import tkinter as tk
-import os
+import queue
 import sys
+import threading
 import time
 import cv2
 import numpy as np
@@ -18,6 +20,20 @@ from core.text_to_speech import TextToSpeech
 from ui.main_window import MainWindow
 import config  # Import the config module directly
 
+logger = logging.getLogger(__name__)
+
+# Label shown for hands that match no gesture template. cv2.putText with a Hershey
+# font costs ~10 us per label, less than blitting a cached pre-rendered mask, so
+# labels are drawn directly each frame.
+_UNKNOWN_GESTURE = {'name': 'Unknown', 'color': (255, 255, 255)}
+
+# Time between camera frames; the Tk loop checks for the next frame this long after
+# showing one, less the time showing it took
+_FRAME_INTERVAL_MS = max(1, int(1000 / config.CAMERA_FPS))
+
+# Longest a gesture recording waits for enough frames with a hand in them
+_RECORD_TIMEOUT_S = 3.0
+
 
 class SignToSpeechApp:
     def __init__(self, root):
@@ -30,18 +46,11 @@ class SignToSpeechApp:
         
         # Initialize gesture database with the path from config
         self.gesture_db = GestureDatabase(config.GESTURES_DB_PATH)
-        print(f"Using gesture database at: {config.GESTURES_DB_PATH}")
+        logger.info("Using gesture database at: %s", config.GESTURES_DB_PATH)
         
         # Initialize text-to-speech
         self.tts = TextToSpeech()
         
-        # Make sure the database is properly initialized
-        if not os.path.exists(config.GESTURES_DB_PATH):
-            print("Creating new gesture database...")
-            # Save an empty database to ensure the file exists
-            with open(config.GESTURES_DB_PATH, 'w') as f:
-                json.dump({"version": 1, "gestures": {}}, f, indent=2)
-        
         # Initialize UI
         self.ui = MainWindow(root)
         
@@ -52,6 +61,39 @@ class SignToSpeechApp:
         self.is_camera_running = False
         self.last_gesture_time = 0
         self.current_gesture = None
+        
+        # Latest annotated frame from the inference thread waiting to be shown. A
+        # single slot: a newer frame replaces one the UI hasn't picked up yet, so
+        # the preview never shows stale frames when Tk falls behind
+        self._frame_q = queue.Queue(maxsize=1)
+        self._infer_thread = None
+        # Reused frames to draw on: one queued, one on screen and one being drawn.
+        # Indices of the ones nobody holds are kept in _free_bufs: the worker takes
+        # one to draw into and gets it back if Tk never picked it up; Tk gives back
+        # the shown one once it has shown the next. Queued items carry their index
+        # (None for a skipped frame, which repeats only the last match).
+        self._draw_bufs = [None] * 3
+        self._free_bufs = list(range(len(self._draw_bufs)))
+        self._bufs_lock = threading.Lock()
+        self._shown_idx = None
+        # Gray thumbnails of the last processed frame and the current one, for
+        # skipping inference when the scene hasn't changed
+        self._prev_small = None
+        self._small_buf = None
+        self._gray_buf = None
+        self._diff_buf = None
+        # What the last inference found: a tracked hand always reruns inference, and
+        # a skipped frame passes the last match on again
+        self._hand_tracked = False
+        self._last_matched = None
+        # Gesture recording in progress: the inference thread writes the first hand's
+        # landmarks of each frame into _record_buf, the Tk thread only reads the result
+        self._record_lock = threading.Lock()
+        self._record_buf = None
+        self._record_count = 0
+        # Delay before checking an empty frame queue again; doubles up to a frame
+        # interval while the worker has nothing, so a paused feed rarely wakes Tk
+        self._poll_delay_ms = 1
     
     def _setup_callbacks(self):
         """Set up UI callbacks."""
@@ -75,102 +117,234 @@ class SignToSpeechApp:
         if not self.is_camera_running:
             self.is_camera_running = True
             self.ui.set_status("Camera started. Show your hand gesture.")
+            # Nothing is queued or on screen from an earlier run any more
+            try:
+                self._frame_q.get_nowait()
+            except queue.Empty:
+                pass
+            with self._bufs_lock:
+                self._free_bufs = list(range(len(self._draw_bufs)))
+            self._shown_idx = None
+            self._prev_small = None
+            self._hand_tracked = False
+            self._last_matched = None
+            self._infer_thread = threading.Thread(target=self._infer_loop, daemon=True)
+            self._infer_thread.start()
             self._process_frame()
     
     def _stop_camera(self):
         """Stop the camera."""
         self.is_camera_running = False
+        self._join_infer_thread()
         self.ui.set_status("Camera stopped. Click 'Open Camera' to start again.")
     
+    def _join_infer_thread(self):
+        """Wait for the inference thread to finish its current frame and exit."""
+        if self._infer_thread is not None and self._infer_thread is not threading.current_thread():
+            self._infer_thread.join(timeout=1.0)
+        self._infer_thread = None
+    
+    def _infer_loop(self):
+        """Capture frames and run hand tracking off the Tk thread, queueing annotated frames."""
+        while self.is_camera_running:
+            idx = None  # Draw buffer taken from the free list and not queued yet
+            try:
+                frame = self.camera.get_frame()
+                if frame is None:
+                    # No new frame from the camera yet
+                    time.sleep(0.005)
+                    continue
+                    
+                # A static scene without a hand gives the same overlay, and the preview
+                # already shows it. Only the last match is queued again, so Tk still
+                # sees it; a recording wants every frame though
+                if (not self._frame_changed(frame) and not self._hand_tracked
+                        and self._record_buf is None):
+                    try:
+                        self._frame_q.put_nowait((None, None, self._last_matched))
+                    except queue.Full:
+                        # The queued frame is newer than anything this would repeat
+                        pass
+                    continue
+                    
+                # Copy the camera's reusable buffer into one of ours so it can be drawn
+                # on and handed to Tk
+                with self._bufs_lock:
+                    idx = self._free_bufs.pop()
+                frame_copy = self._draw_bufs[idx]
+                if frame_copy is None or frame_copy.shape != frame.shape:
+                    frame_copy = self._draw_bufs[idx] = np.empty(frame.shape, dtype=frame.dtype)
+                np.copyto(frame_copy, frame)
+                matched_gesture = self._last_matched = self._annotate_frame(frame_copy)
+                
+                # Replace a frame the UI hasn't picked up yet rather than building latency;
+                # only this thread puts, so the slot is free again after the get
+                item = (idx, frame_copy, matched_gesture)
+                try:
+                    self._frame_q.put_nowait(item)
+                except queue.Full:
+                    try:
+                        dropped = self._frame_q.get_nowait()
+                    except queue.Empty:
+                        pass
+                    else:
+                        if dropped[0] is not None:
+                            with self._bufs_lock:
+                                self._free_bufs.append(dropped[0])
+                    self._frame_q.put_nowait(item)
+                idx = None
+                    
+            except Exception as e:
+                logger.exception("Error processing frame")
+                if idx is not None:
+                    with self._bufs_lock:
+                        self._free_bufs.append(idx)
+                # Keep processing frames even if one fails
+                time.sleep(0.03)
+    
+    def _frame_changed(self, frame) -> bool:
+        """Return True if the frame differs enough from the last processed one to rerun inference."""
+        self._small_buf = cv2.resize(frame, config.FRAME_DIFF_SIZE, dst=self._small_buf,
+                                     interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(self._small_buf, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+        
+        prev = self._prev_small
+        if prev is not None and prev.shape == gray.shape:
+            # Count the pixels that changed a lot rather than averaging the change: a
+            # finger moving in front of a still background is only a few thumbnail
+            # pixels and vanishes in the mean
+            diff = self._diff_buf = cv2.absdiff(gray, prev, dst=self._diff_buf)
+            cv2.threshold(diff, config.FRAME_DIFF_PIXEL_THRESHOLD, 255, cv2.THRESH_BINARY, dst=diff)
+            if cv2.countNonZero(diff) < config.FRAME_DIFF_MIN_PIXELS:
+                return False
+                
+        # Keep this thumbnail as the reference and reuse the old one's memory next time
+        self._prev_small, self._gray_buf = gray, prev
+        return True
+    
+    def _annotate_frame(self, frame_copy):
+        """
+        Run hand tracking on a frame and draw the landmarks and gesture text on it.
+        
+        Returns:
+            The matched database gesture, or None
+        """
+        matched_gesture = None
+        
+        # Process hand landmarks
+        results = self.hand_tracker.process_frame(frame_copy)
+        self._hand_tracked = bool(results and getattr(results, 'multi_hand_landmarks', None))
+        
+        # Draw landmarks on frame if hands are detected
+        if self._hand_tracked:
+            # Bind the per-hand calls and settings once per frame
+            tracker = self.hand_tracker
+            get_landmarks = tracker.get_landmarks_list
+            recognize = tracker._recognize_gesture
+            draw = tracker.draw_landmarks
+            find_similar = self.gesture_db.find_similar_gesture
+            threshold = config.GESTURE_RECOGNITION_THRESHOLD
+            gesture_types = config.GESTURE_TYPES
+            put_text = cv2.putText
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            recording = self._record_buf is not None
+            
+            # Process each detected hand
+            for hand_landmarks in results.multi_hand_landmarks:
+                # Get landmarks as a flat array for gesture recognition
+                landmarks = get_landmarks(hand_landmarks)
+                
+                if landmarks is not None and len(landmarks) > 0:
+                    # A recording takes the first hand of each frame
+                    if recording:
+                        self._record_sample(landmarks)
+                        recording = False
+                        
+                    # Recognize the gesture based on hand shape
+                    gesture_type = recognize(landmarks)
+                    
+                    # Find the closest matching gesture in the database. This normalizes the
+                    # landmarks again, differently on purpose: templates are matched
+                    # rotation-invariantly, stored gestures keep their orientation
+                    # (thumbs up vs thumbs down), so the two can't share one pass
+                    matched = find_similar(landmarks, threshold)
+                    
+                    # Use the recognized gesture type to get the display name and color
+                    gesture_info = gesture_types.get(gesture_type, _UNKNOWN_GESTURE)
+                    
+                    # Draw landmarks with gesture-specific color
+                    draw(frame_copy, hand_landmarks, gesture_type)
+                    
+                    # If we found a matching gesture in the database, use its message
+                    if matched:
+                        matched_gesture = matched
+                        
+                        # Display the recognized gesture and message
+                        message = matched.get('message', '')
+                        put_text(frame_copy, f"{gesture_info['name']}: {message}", (10, 30),
+                                 font, 0.8, gesture_info['color'], 2)
+                    else:
+                        # Just show the recognized gesture type
+                        put_text(frame_copy, gesture_info['name'], (10, 30),
+                                 font, 0.8, gesture_info['color'], 2)
+        else:
+            # No hands detected
+            cv2.putText(frame_copy, "No hands detected", (10, 30), 
+                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        
+        return matched_gesture
+    
+    def _record_sample(self, landmarks) -> None:
+        """Add one frame's landmarks to the recording in progress, if it still needs any."""
+        with self._record_lock:
+            buf = self._record_buf
+            if buf is not None and self._record_count < len(buf):
+                buf[self._record_count] = landmarks
+                self._record_count += 1
+    
     def _process_frame(self):
-        """Process a single frame from the camera."""
+        """Show the latest annotated frame from the inference thread; runs on the Tk loop."""
         if not self.is_camera_running:
             return
             
+        start = time.perf_counter()
         try:
-            # Get frame from camera
-            frame = self.camera.get_frame()
+            idx, frame_copy, matched_gesture = self._frame_q.get_nowait()
+        except queue.Empty:
+            # Nothing new yet; check back a little later each time
+            self._poll_delay_ms = min(self._poll_delay_ms * 2, _FRAME_INTERVAL_MS)
+            self.root.after(self._poll_delay_ms, self._process_frame)
+            return
+        self._poll_delay_ms = 1
             
-            if frame is not None:
-                # Make a copy of the frame for drawing
-                frame_copy = frame.copy()
-                
-                # Process hand landmarks
-                results = self.hand_tracker.process_frame(frame_copy)
-                
-                # Draw landmarks on frame if hands are detected
-                if results and hasattr(results, 'multi_hand_landmarks') and results.multi_hand_landmarks:
-                    # Process each detected hand
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        # Get landmarks as a list for gesture recognition
-                        landmarks = self.hand_tracker.get_landmarks_list(hand_landmarks)
-                        
-                        if landmarks and len(landmarks) > 0:
-                            # Recognize the gesture based on hand shape
-                            gesture_type = self.hand_tracker._recognize_gesture(landmarks)
-                            
-                            # Find the closest matching gesture in the database
-                            matched_gesture = self.gesture_db.find_similar_gesture(
-                                landmarks,
-                                config.GESTURE_RECOGNITION_THRESHOLD
-                            )
-                            
-                            # Use the recognized gesture type to get the display name and color
-                            gesture_info = config.GESTURE_TYPES.get(gesture_type, {
-                                'name': 'Unknown',
-                                'color': (255, 255, 255)
-                            })
-                            
-                            # Draw landmarks with gesture-specific color
-                            self.hand_tracker.draw_landmarks(
-                                frame_copy,
-                                hand_landmarks,
-                                gesture_type
-                            )
-                            
-                            # If we found a matching gesture in the database, use its message
-                            if matched_gesture:
-                                self._handle_gesture_recognition(matched_gesture)
-                                
-                                # Display the recognized gesture and message
-                                message = matched_gesture.get('message', '')
-                                cv2.putText(frame_copy, 
-                                          f"{gesture_info['name']}: {message}", 
-                                          (10, 30), 
-                                          cv2.FONT_HERSHEY_SIMPLEX, 
-                                          0.8, 
-                                          gesture_info['color'], 
-                                          2)
-                            else:
-                                # Just show the recognized gesture type
-                                cv2.putText(frame_copy, 
-                                          gesture_info['name'], 
-                                          (10, 30), 
-                                          cv2.FONT_HERSHEY_SIMPLEX, 
-                                          0.8, 
-                                          gesture_info['color'], 
-                                          2)
-                else:
-                    # No hands detected
-                    cv2.putText(frame_copy, "No hands detected", (10, 30), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        # This buffer stays out of the free list while it's on screen; the one it
+        # replaces can be drawn into again. A skipped frame carries no buffer and
+        # leaves the shown one up
+        if idx is not None:
+            with self._bufs_lock:
+                if self._shown_idx is not None:
+                    self._free_bufs.append(self._shown_idx)
+                self._shown_idx = idx
+        
+        try:
+            # Widget updates and speech stay on the Tk thread
+            if matched_gesture:
+                self._handle_gesture_recognition(matched_gesture)
                 
-                # Update the UI with the processed frame
+            # Update the UI with the processed frame
+            if frame_copy is not None:
                 self.ui.update_video_frame(frame_copy)
-            
-            # Schedule next frame
-            self.root.after(30, self._process_frame)
-            
         except Exception as e:
-            print(f"Error processing frame: {e}")
-            import traceback
-            traceback.print_exc()
-            # Try to continue processing frames even if one fails
-            self.root.after(30, self._process_frame)
+            logger.exception("Error displaying frame")
+        
+        # The next frame is due one camera interval after this one, and this one
+        # already took part of that to show
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+        self.root.after(max(1, _FRAME_INTERVAL_MS - elapsed_ms), self._process_frame)
     
     def _handle_gesture_recognition(self, gesture):
         """Handle a recognized gesture."""
-        current_time = time.time()
+        current_time = time.monotonic()
         
         # Avoid processing the same gesture multiple times in quick succession
         if (self.current_gesture != gesture['id'] or 
@@ -218,58 +392,65 @@ class SignToSpeechApp:
             gesture_name = gesture_choice
             message = default_gestures[gesture_choice]
         
-        # Give user time to prepare
-        self.ui.set_status(f"Preparing to record '{gesture_name}' in 3 seconds...")
-        self.root.update()
-        time.sleep(1)
-        self.ui.set_status(f"Preparing to record '{gesture_name}' in 2 seconds...")
-        self.root.update()
-        time.sleep(1)
-        self.ui.set_status(f"Preparing to record '{gesture_name}' in 1 second...")
-        self.root.update()
-        time.sleep(1)
-        
-        # Capture multiple frames and average the landmarks for better accuracy
-        frames_to_capture = 10
-        landmarks_list = []
+        # Give user time to prepare; the countdown and capture run from Tk timers so
+        # the preview keeps updating meanwhile
+        self._show_record_countdown(gesture_name, message, 3)
+    
+    def _show_record_countdown(self, gesture_name: str, message: str, count: int):
+        """Count down to recording a gesture, one second per step, without blocking the Tk loop."""
+        if count > 0:
+            unit = "second" if count == 1 else "seconds"
+            self.ui.set_status(f"Preparing to record '{gesture_name}' in {count} {unit}...")
+            self.root.after(1000, self._show_record_countdown, gesture_name, message, count - 1)
+        else:
+            self._begin_capture(gesture_name, message)
+    
+    def _begin_capture(self, gesture_name: str, message: str, frames_to_capture: int = 10):
+        """Capture several frames and save the averaged landmarks as a gesture."""
+        # Capture multiple frames and average the landmarks for better accuracy. The
+        # inference thread fills the buffer from the frames it already tracks; this
+        # side only polls the progress, so the camera and MediaPipe stay off the Tk thread
+        landmarks_buf = np.empty((frames_to_capture, 21 * 3), dtype=np.float32)
+        with self._record_lock:
+            self._record_buf = landmarks_buf
+            self._record_count = 0
+        deadline = time.monotonic() + _RECORD_TIMEOUT_S
         
         self.ui.set_status(f"Show the '{gesture_name}' gesture now... (Capturing {frames_to_capture} frames)")
         
-        for i in range(frames_to_capture):
-            frame = self.camera.get_frame()
-            if frame is not None:
-                results = self.hand_tracker.process_frame(frame)
-                if results and results.multi_hand_landmarks:
-                    landmarks = self.hand_tracker.get_landmarks_list(results.multi_hand_landmarks[0])
-                    if landmarks:
-                        landmarks_list.append(landmarks)
-                
-                # Show countdown
-                self.ui.set_status(f"Capturing '{gesture_name}'... {i+1}/{frames_to_capture}")
-                self.root.update()
+        def check_capture():
+            with self._record_lock:
+                captured = self._record_count
+                done = (captured >= frames_to_capture or time.monotonic() >= deadline
+                        or not self.is_camera_running)
+                if done:
+                    # Stop the inference thread from writing into the buffer
+                    self._record_buf = None
+                    
+            if not done:
+                # Show progress
+                self.ui.set_status(f"Capturing '{gesture_name}'... {captured}/{frames_to_capture}")
+                self.root.after(100, check_capture)
+                return
             
-            time.sleep(0.1)  # Small delay between captures
-        
-        if not landmarks_list:
-            self.ui.show_error("Error", "No hand detected. Please try again.")
-            return
-        
-        # Calculate average landmarks
-        avg_landmarks = [sum(x) / len(x) for x in zip(*landmarks_list)]
-        
-        # Add to database with a unique ID based on the gesture name
-        gesture_id = f"gesture_{gesture_name.lower().replace(' ', '_')}_{int(time.time())}"
-        
-        self.gesture_db.gestures[gesture_id] = {
-            'name': gesture_name,
-            'message': message,
-            'landmarks': avg_landmarks,
-            'created_at': int(time.time())
-        }
+            if not captured:
+                self.ui.show_error("Error", "No hand detected. Please try again.")
+                return
+            
+            # Calculate average landmarks over the captured rows
+            avg_landmarks = landmarks_buf[:captured].mean(axis=0)
+            
+            # Add to database with a unique ID based on the gesture name
+            gesture_id = f"gesture_{gesture_name.lower().replace(' ', '_')}_{int(time.time())}"
+            
+            if not self.gesture_db.add_gesture(gesture_id, gesture_name, avg_landmarks, message):
+                self.ui.show_error("Error", "Failed to save gesture.")
+                return
+                
+            self.ui.show_info("Success", f"Gesture '{gesture_name}' added successfully!")
+            self.ui.set_status("Ready. Show a gesture to the camera.")
         
-        self.gesture_db.save_gestures()
-        self.ui.show_info("Success", f"Gesture '{gesture_name}' added successfully!")
-        self.ui.set_status("Ready. Show a gesture to the camera.")
+        self.root.after(100, check_capture)
     
     def _on_edit_gesture(self):
         """Handle editing an existing gesture's message."""
@@ -294,6 +475,7 @@ class SignToSpeechApp:
     def _on_closing(self):
         """Clean up resources before closing the application."""
         self.is_camera_running = False
+        self._join_infer_thread()
         self.camera.release()
         self.hand_tracker.release()
         self.tts.cleanup()
@@ -311,113 +493,5 @@ def main():
     # Start the main event loop
     root.mainloop()
 
-# In your main application class (e.g., SignToSpeechApp)
-def _on_add_gesture(self):
-    """Handle adding/recording a new gesture."""
-    if not self.is_camera_running:
-        self.ui.show_error("Error", "Please start the camera first.")
-        return
-    
-    # Show gesture selection dialog
-    default_gestures = {
-        "Palm": "WAIT A MINUTE",
-        "Fist": "I NEED HELP",
-        "Point Up": "I HAVE A DOUBT"
-    }
-    
-    # Let user select which gesture to record
-    gesture_choice = self.ui.get_choice(
-        "Select Gesture",
-        "Choose a gesture to record:",
-        list(default_gestures.keys()) + ["Custom Gesture"]
-    )
-    
-    if not gesture_choice:
-        return  # User cancelled
-        
-    if gesture_choice == "Custom Gesture":
-        # For custom gestures, get name and message
-        gesture_name = self.ui.get_text_input("Add Gesture", "Enter a name for this gesture:")
-        if not gesture_name:
-            return
-            
-        message = self.ui.get_text_input("Add Gesture", "Enter the message for this gesture:")
-        if not message:
-            return
-    else:
-        # For default gestures, use predefined names and messages
-        gesture_name = gesture_choice
-        message = default_gestures[gesture_choice]
-    
-    # Show countdown before recording
-    self._show_countdown(gesture_name)
-    
-    # Record the gesture
-    self._record_gesture(gesture_name, message)
-
-def _show_countdown(self, gesture_name: str, count: int = 3):
-    """Show a countdown before recording starts."""
-    if count > 0:
-        self.ui.set_status(f"Recording '{gesture_name}' in {count}...")
-        self.root.after(1000, lambda: self._show_countdown(gesture_name, count - 1))
-    else:
-        self.ui.set_status(f"Recording '{gesture_name}'... Show your hand now!")
-
-def _record_gesture(self, gesture_name: str, message: str, frames_to_capture: int = 30):
-    """Record hand landmarks for a new gesture."""
-    landmarks_list = []
-    captured_frames = 0
-    
-    def capture_frame():
-        nonlocal captured_frames, landmarks_list
-        
-        if captured_frames >= frames_to_capture:
-            # Done capturing, process the landmarks
-            if landmarks_list:
-                # Average the landmarks for better accuracy
-                avg_landmarks = np.mean(landmarks_list, axis=0).flatten().tolist()
-                
-                # Create a unique ID for the gesture
-                gesture_id = f"{gesture_name.lower().replace(' ', '_')}_{int(time.time())}"
-                
-                # Save to database
-                if self.gesture_db.add_gesture(gesture_id, gesture_name, avg_landmarks, message):
-                    self.ui.show_info("Success", f"Gesture '{gesture_name}' recorded successfully!")
-                    self.ui.update_gesture_list(self.gesture_db.get_all_gestures())
-                else:
-                    self.ui.show_error("Error", "Failed to save gesture.")
-            else:
-                self.ui.show_error("Error", "No hand detected. Please try again.")
-            
-            self.ui.set_status("Ready")
-            return
-        
-        # Capture a frame
-        frame = self.camera.get_frame()
-        if frame is not None:
-            results = self.hand_tracker.process_frame(frame)
-            
-            if results and results.multi_hand_landmarks:
-                # Get landmarks for the first detected hand
-                landmarks = self.hand_tracker.get_landmarks_list(results.multi_hand_landmarks[0])
-                if landmarks:
-                    landmarks_list.append(landmarks)
-                    captured_frames += 1
-                    self.ui.set_status(f"Recording '{gesture_name}'... {captured_frames}/{frames_to_capture}")
-            
-            # Draw landmarks on frame for feedback
-            if results and results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    self.hand_tracker.draw_landmarks(frame, hand_landmarks)
-            
-            # Show the frame with landmarks
-            self.ui.update_video_frame(frame)
-        
-        # Schedule next frame capture
-        self.root.after(50, capture_frame)  # ~20 FPS
-    
-    # Start the capture process
-    capture_frame()
-    
 if __name__ == "__main__":
     main()
@@ -1,71 +1,82 @@
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox, font as tkfont
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, List, Tuple
 from config import UI_COLORS
 from .video_feed_widget import VideoFeedWidget
-from PIL import Image, ImageTk
 import os
 
-# Custom style for ttk widgets
-def configure_styles():
-    style = ttk.Style()
-    
-    # Configure the main window style
-    style.configure('.', background=UI_COLORS['background'])
+logger = logging.getLogger(__name__)
+
+# Custom style for ttk widgets, as style name -> options
+_STYLE_CONFIGS = {
+    # Main window
+    '.': dict(background=UI_COLORS['background']),
     
-    # Configure button styles
-    style.configure('TButton',
-                   padding=6,
-                   relief='flat',
-                   background=UI_COLORS['button_bg'],
-                   foreground=UI_COLORS['button_fg'],
-                   font=('Segoe UI', 10, 'bold'))
+    # Buttons
+    'TButton': dict(padding=6,
+                    relief='flat',
+                    background=UI_COLORS['button_bg'],
+                    foreground=UI_COLORS['button_fg'],
+                    font=('Segoe UI', 10, 'bold')),
+    'BlackText.TButton': dict(foreground='black'),
     
-    style.map('TButton',
-             background=[('active', UI_COLORS['button_active']),
-                       ('pressed', UI_COLORS['accent'])],
-             foreground=[('active', 'white')])
+    # Label frames
+    'TLabelframe': dict(background=UI_COLORS['background'],
+                        foreground=UI_COLORS['text'],
+                        borderwidth=2,
+                        relief='groove'),
+    'TLabelframe.Label': dict(background=UI_COLORS['header_bg'],
+                              foreground=UI_COLORS['text'],
+                              font=('Segoe UI', 10, 'bold')),
     
-    # Configure label frames
-    style.configure('TLabelframe',
-                   background=UI_COLORS['background'],
+    # Labels
+    'TLabel': dict(background=UI_COLORS['background'],
                    foreground=UI_COLORS['text'],
-                   borderwidth=2,
-                   relief='groove')
+                   font=('Segoe UI', 10)),
     
-    style.configure('TLabelframe.Label',
-                   background=UI_COLORS['header_bg'],
-                   foreground=UI_COLORS['text'],
-                   font=('Segoe UI', 10, 'bold'))
-    
-    # Configure labels
-    style.configure('TLabel',
-                   background=UI_COLORS['background'],
-                   foreground=UI_COLORS['text'],
-                   font=('Segoe UI', 10))
+    # Paned window
+    'TPanedwindow': dict(background=UI_COLORS['background']),
     
-    # Configure paned window
-    style.configure('TPanedwindow',
-                   background=UI_COLORS['background'])
+    # Scrollbars
+    'Vertical.TScrollbar': dict(background=UI_COLORS['secondary'],
+                                troughcolor=UI_COLORS['background'],
+                                arrowcolor=UI_COLORS['text'],
+                                bordercolor=UI_COLORS['background']),
+    'Custom.Vertical.TScrollbar': dict(arrowcolor=UI_COLORS['text'],
+                                       background=UI_COLORS['secondary']),
     
-    # Configure scrollbar
-    style.configure('Vertical.TScrollbar',
-                   background=UI_COLORS['secondary'],
-                   troughcolor=UI_COLORS['background'],
-                   arrowcolor=UI_COLORS['text'],
-                   bordercolor=UI_COLORS['background'])
-    
-    # Configure entry
-    style.configure('TEntry',
-                  fieldbackground=UI_COLORS['canvas_bg'],
-                  foreground=UI_COLORS['text'],
-                  insertcolor=UI_COLORS['text'])
+    # Entry
+    'TEntry': dict(fieldbackground=UI_COLORS['canvas_bg'],
+                   foreground=UI_COLORS['text'],
+                   insertcolor=UI_COLORS['text']),
+}
+
+# State-dependent style options, as style name -> options
+_STYLE_MAPS = {
+    'TButton': dict(background=[('active', UI_COLORS['button_active']),
+                                ('pressed', UI_COLORS['accent'])],
+                    foreground=[('active', 'white')]),
+    'TCombobox': dict(fieldbackground=[('readonly', UI_COLORS['canvas_bg'])],
+                      selectbackground=[('readonly', UI_COLORS['primary'])],
+                      selectforeground=[('readonly', 'white')]),
+}
+
+# Root window the styles were last configured for
+_styled_root = None
+
+def configure_styles(root=None):
+    """Configure the ttk styles, once per root window."""
+    global _styled_root
+    if root is not None and root is _styled_root:
+        return
+    _styled_root = root
     
-    # Configure combobox
-    style.map('TCombobox',
-             fieldbackground=[('readonly', UI_COLORS['canvas_bg'])],
-             selectbackground=[('readonly', UI_COLORS['primary'])],
-             selectforeground=[('readonly', 'white')])
+    style = ttk.Style(root)
+    for name, options in _STYLE_CONFIGS.items():
+        style.configure(name, **options)
+    for name, options in _STYLE_MAPS.items():
+        style.map(name, **options)
 
 class MainWindow:
     def __init__(self, root, title: str = "Sign-to-Speech Translator"):
@@ -86,7 +97,7 @@ class MainWindow:
             if os.path.exists(icon_path):
                 self.root.iconbitmap(icon_path)
         except Exception as e:
-            print(f"Could not load window icon: {e}")
+            logger.warning("Could not load window icon: %s", e)
         
         # Configure the root window style
         self.root.configure(bg=UI_COLORS['background'])
@@ -96,7 +107,7 @@ class MainWindow:
         self.root.option_add('*TCombobox*Listbox.selectForeground', 'white')
         
         # Configure ttk styles
-        configure_styles()
+        configure_styles(self.root)
         
         # Set window minimum size
         self.root.minsize(1000, 700)
@@ -134,8 +145,6 @@ class MainWindow:
         control_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
         
         # Add control buttons with icons and better spacing
-        ttk.Style().configure('BlackText.TButton', foreground='black')
-        
         ttk.Button(
             control_frame, 
             text="📷 Open Camera", 
@@ -177,12 +186,7 @@ class MainWindow:
             highlightthickness=0
         )
         
-        # Custom scrollbar with modern look
-        style = ttk.Style()
-        style.configure('Custom.Vertical.TScrollbar', 
-                       arrowcolor=UI_COLORS['text'],
-                       background=UI_COLORS['secondary'])
-        
+        # Custom scrollbar with modern look (styled in configure_styles)
         scrollbar = ttk.Scrollbar(
             gesture_list_frame, 
             orient="vertical", 
@@ -190,14 +194,33 @@ class MainWindow:
             style='Custom.Vertical.TScrollbar'
         )
         
-        self.gesture_list_frame = ttk.Frame(canvas, style='TFrame')
-        self.gesture_list_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        # Virtualized gesture list: every gesture is a (gesture_id, text) row, but only
+        # a small pool of canvas items exists, re-pointed at whichever rows are in view.
+        # Each pooled row is a rectangle plus a text item, far lighter than a widget.
+        self.gesture_canvas = canvas
+        self._gesture_scrollbar = scrollbar
+        self._gesture_rows: List[Tuple[str, str]] = []
+        self._gesture_list_shown = False
+        self._row_pool: List[Tuple[int, int]] = []  # (rectangle item, text item)
+        self._pool_rows: List[Optional[int]] = []  # Row index each pooled row shows
+        self._pool_texts: List[Optional[str]] = []  # Text each pooled row shows
+        self._row_font = ('Segoe UI', 10)
+        # Two text lines (name and message) plus padding and the gap between rows
+        self._row_height = 2 * tkfont.Font(family='Segoe UI', size=10).metrics('linespace') + 16
+        self._row_width = 1
+        self._empty_item = canvas.create_text(
+            10, 10,
+            text="No gestures found. Add some gestures to get started!",
+            width=250,
+            justify=tk.CENTER,
+            anchor="nw",
+            fill="gray",
+            font=self._row_font,
+            state='hidden'
         )
         
-        canvas.create_window((0, 0), window=self.gesture_list_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.configure(yscrollcommand=self._on_gesture_scroll)
+        canvas.bind("<Configure>", self._on_gesture_canvas_configure)
         
         # Pack the canvas and scrollbar
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=2, pady=2)
@@ -262,9 +285,6 @@ class MainWindow:
         # Set initial status
         self.status_var.set("✅ Ready")
         
-        # Store the gesture labels for updating later
-        self.gesture_labels = []
-        
         # Initialize with empty gestures
         self.update_gesture_list({})
     
@@ -275,44 +295,91 @@ class MainWindow:
         Args:
             gestures: Dictionary of gestures with their details
         """
-        # Clear existing gesture labels
-        for widget in self.gesture_list_frame.winfo_children():
-            widget.destroy()
-        
-        if not gestures:
-            ttk.Label(
-                self.gesture_list_frame,
-                text="No gestures found. Add some gestures to get started!",
-                wraplength=250,
-                justify=tk.CENTER,
-                foreground="gray"
-            ).pack(padx=10, pady=10, fill=tk.X)
-            return
-        
-        # Add each gesture to the list
+        rows = []
         for gesture_id, gesture in gestures.items():
-            frame = ttk.Frame(self.gesture_list_frame)
-            frame.pack(fill=tk.X, padx=5, pady=2)
-            
             # Gesture name and details
             details = f"{gesture.get('name', 'Unnamed Gesture')}"
             if 'message' in gesture and gesture['message']:
                 details += f"\n💬 {gesture['message']}"
+            rows.append((gesture_id, details))
             
-            label = ttk.Label(
-                frame,
-                text=details,
-                anchor=tk.W,
-                justify=tk.LEFT,
-                padding=(10, 5, 10, 5),
-                relief=tk.GROOVE,
-                borderwidth=1
-            )
-            label.pack(fill=tk.X, expand=True)
+        # Nothing to redraw if the shown rows didn't change; comparing the rows
+        # themselves rather than a hash means a collision can't hide a change
+        if rows == self._gesture_rows and self._gesture_list_shown:
+            return
+        self._gesture_rows = rows
+        self._gesture_list_shown = True
+        
+        canvas = self.gesture_canvas
+        canvas.itemconfigure(self._empty_item, state='normal' if not rows else 'hidden')
+        canvas.configure(scrollregion=(0, 0, self._row_width, len(rows) * self._row_height))
+        self._refresh_visible_rows()
+    
+    def _on_gesture_canvas_configure(self, event) -> None:
+        """Resize the row pool to the visible height and stretch the rows to the canvas width."""
+        self._row_width = event.width
+        visible = -(-event.height // self._row_height) + 2
+        canvas = self.gesture_canvas
+        while len(self._row_pool) < visible:
+            rect = canvas.create_rectangle(0, 0, 0, 0, fill=UI_COLORS['background'],
+                                           outline=UI_COLORS['header_bg'], state='hidden',
+                                           tags=('gesture',))
+            text = canvas.create_text(0, 0, anchor=tk.W, justify=tk.LEFT, fill=UI_COLORS['text'],
+                                      font=self._row_font, state='hidden', tags=('gesture',))
+            self._row_pool.append((rect, text))
+            self._pool_rows.append(None)
+            self._pool_texts.append(None)
             
-            # Store the gesture ID with the label
-            label.gesture_id = gesture_id
-            self.gesture_labels.append(label)
+        for rect, text in self._row_pool:
+            canvas.itemconfigure(text, width=max(1, event.width - 30))
+        canvas.configure(scrollregion=(0, 0, event.width, len(self._gesture_rows) * self._row_height))
+        self._refresh_visible_rows(force=True)
+    
+    def _on_gesture_scroll(self, first, last) -> None:
+        """Keep the scrollbar in step with the canvas and fill in the rows scrolled into view."""
+        self._gesture_scrollbar.set(first, last)
+        self._refresh_visible_rows()
+    
+    def _refresh_visible_rows(self, force: bool = False) -> None:
+        """
+        Point the pooled canvas items at the rows currently in the viewport.
+        
+        Pooled rows still showing the same row index are left in place and only
+        get their text updated if it changed; force re-lays out every row.
+        """
+        canvas = self.gesture_canvas
+        rows = self._gesture_rows
+        row_height = self._row_height
+        first = max(0, int(canvas.canvasy(0) // row_height))
+        for k, (rect, text) in enumerate(self._row_pool):
+            index = first + k
+            if index >= len(rows):
+                if self._pool_rows[k] is not None:
+                    canvas.itemconfigure(rect, state='hidden')
+                    canvas.itemconfigure(text, state='hidden')
+                    self._pool_rows[k] = None
+                continue
+            label = rows[index][1]
+            if index == self._pool_rows[k] and not force:
+                if label != self._pool_texts[k]:
+                    canvas.itemconfigure(text, text=label)
+                    self._pool_texts[k] = label
+                continue
+                
+            top = index * row_height + 2
+            canvas.coords(rect, 5, top, self._row_width - 5, top + row_height - 4)
+            canvas.coords(text, 15, top + (row_height - 4) // 2)
+            canvas.itemconfigure(text, text=label, state='normal')
+            canvas.itemconfigure(rect, state='normal')
+            self._pool_rows[k] = index
+            self._pool_texts[k] = label
+    
+    def gesture_id_at(self, y: int) -> Optional[str]:
+        """Return the ID of the gesture shown at window y-coordinate y on the list canvas, if any."""
+        index = int(self.gesture_canvas.canvasy(y) // self._row_height)
+        if 0 <= index < len(self._gesture_rows):
+            return self._gesture_rows[index][0]
+        return None
     
     # Callback setters
     def set_add_gesture_callback(self, callback: Callable[[], None]) -> None:
@@ -369,30 +436,6 @@ class MainWindow:
             if self.on_delete_gesture_cb:
                 self.on_delete_gesture_cb(gesture_id)
     
-        self.gesture_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Add gestures to the treeview
-        for gesture_id, gesture in gestures.items():
-            self.gesture_tree.insert(
-                "",
-                "end",
-                iid=gesture_id,
-                values=(
-                    gesture.get("name", "Unnamed"),
-                    gesture.get("message", "")
-                )
-            )
-        
-        # Add context menu for right-click actions
-        self.setup_gesture_context_menu()
-        
-        # Bind double-click to edit
-        self.gesture_tree.bind("<Double-1>", self.on_gesture_double_click)
-        
-        # Update the canvas scroll region
-        self.gesture_list_frame.update_idletasks()
-    
     def setup_gesture_context_menu(self) -> None:
         """Set up the right-click context menu for gestures."""
         self.context_menu = tk.Menu(self.root, tearoff=0)
@@ -424,11 +467,14 @@ class MainWindow:
     
     def set_status(self, message: str) -> None:
         """Update the status message."""
-        self.status_var.set(message)
+        # Setting an unchanged value still fires the variable's traces and relayouts the label
+        if self.status_var.get() != message:
+            self.status_var.set(message)
     
     def set_recognized_text(self, text: str) -> None:
         """Update the recognized text display."""
-        self.recognized_text.set(text)
+        if self.recognized_text.get() != text:
+            self.recognized_text.set(text)
     
     def create_tooltip(self, widget, text):
         """Create a tooltip for a widget."""